@@ -29,6 +29,12 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            # WAL + NORMAL sync: far fewer fsyncs during bulk indexing, readers don't block the writer
+            "init_command": "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;",
+            # take the write lock at BEGIN so indexing batches never fail upgrading a read lock
+            "transaction_mode": "IMMEDIATE",
+        },
     }
 }
 
@@ -46,6 +52,27 @@ REST_FRAMEWORK = {
 }
 
 DATASET_PATH = os.path.join(BASE_DIR, "data")
+# prefix of the document matrix files written by the indexer and memory-mapped at startup
+DOC_MATRIX_PATH = os.path.join(DATASET_PATH, "doc_matrix")
 EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
 
 CACHE_EMBEDDINGS = True
+# entries in the text -> embedding cache (384 float32 values, ~1.5 KB each)
+EMBEDDING_CACHE_SIZE = 10_000
+
+# Worker processes for embed_batch on CPU-only hosts (0 or 1 embeds in-process). torch
+# already threads each forward pass, but MiniLM-sized matmuls scale poorly past a few cores
+EMBEDDING_CPU_WORKERS = 0
+
+# Maximum number of queries accepted by one /query_batch/ request
+QUERY_BATCH_MAX_SIZE = 100
+
+# Approximate top-k search over the saved document matrix: None for the exact scan, or
+# an HNSW index built by the indexer with "faiss" (needs faiss-cpu or faiss-gpu) or "hnswlib"
+ANN_BACKEND = None
+# Below this many documents the exact scan is fast enough and exact, so no index is built
+ANN_MIN_DOCUMENTS = 50_000
+
+# Score against int8-quantized document embeddings: 4x fewer bytes scanned per query
+# at the cost of a small approximation error in the cosine scores
+EMBEDDING_INT8_SCORING = False
@@ -4,3 +4,10 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 application = get_wsgi_application()
+
+# Load the embedding model with the app rather than on the first request. Servers that
+# import the app before forking workers (gunicorn --preload) then load it once and
+# share the weights copy-on-write instead of every worker loading its own copy.
+from search_api.embedding_service import EmbeddingService  # noqa: E402
+
+EmbeddingService()
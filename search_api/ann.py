@@ -0,0 +1,116 @@
+"""
+Approximate nearest-neighbour indexes over the document matrix.
+
+Optional: an index is only built and used when ANN_BACKEND selects a backend
+whose package is installed. Search falls back to the exact scan otherwise.
+Both backends build an HNSW graph with the same parameters: "faiss" for
+faiss-cpu/faiss-gpu, "hnswlib" for the much smaller hnswlib wheel.
+"""
+
+import logging
+from typing import Any, Tuple
+
+import numpy as np
+from django.conf import settings
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+logger = logging.getLogger(__name__)
+
+# HNSW graph degree and build/search breadth
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 128
+
+
+def _package(backend: str) -> Any:
+    """The imported package for a backend name, None if it is not installed."""
+    if backend == "faiss":
+        return faiss
+    if backend == "hnswlib":
+        return hnswlib
+    raise ValueError(f"Unknown ANN_BACKEND: {backend}")
+
+
+def enabled() -> bool:
+    """Whether ANN_BACKEND selects a backend that can be used in this environment."""
+    backend = settings.ANN_BACKEND
+    if not backend:
+        return False
+    if _package(backend) is None:
+        logger.warning(f"ANN_BACKEND is '{backend}' but {backend} is not installed, using exact search")
+        return False
+    return True
+
+
+def build_index(matrix: np.ndarray) -> Any:
+    """
+    Build an inner-product HNSW index over unit-normalized float32 rows.
+
+    Args:
+        matrix: Document matrix of shape (num_docs, embedding_dim)
+
+    Returns:
+        Index whose row ids are positions in `matrix`
+    """
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    if settings.ANN_BACKEND == "hnswlib":
+        index = hnswlib.Index(space="ip", dim=matrix.shape[1])
+        index.init_index(max_elements=len(matrix), ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+        index.add_items(matrix, np.arange(len(matrix)))
+    else:
+        index = faiss.IndexHNSWFlat(matrix.shape[1], HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.add(matrix)
+    logger.info(f"Built {settings.ANN_BACKEND} HNSW index over {len(matrix)} documents")
+    return index
+
+
+def write_index(index: Any, path: str):
+    """Write an index built by build_index() to path."""
+    if hnswlib is not None and isinstance(index, hnswlib.Index):
+        index.save_index(path)
+    else:
+        faiss.write_index(index, path)
+
+
+def read_index(path: str, dim: int) -> Any:
+    """Read an index written by write_index() for the current ANN_BACKEND."""
+    if settings.ANN_BACKEND == "hnswlib":
+        index = hnswlib.Index(space="ip", dim=dim)
+        index.load_index(path)
+        return index
+    return faiss.read_index(path)
+
+
+def search(index: Any, query_embedding: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Approximate top-k search.
+
+    Args:
+        index: Index from build_index() or read_index()
+        query_embedding: Unit-normalized query of shape (embedding_dim,)
+        k: Number of documents to return
+
+    Returns:
+        Tuple of (row indices, inner-product scores), best first
+    """
+    query_embedding = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+    if hnswlib is not None and isinstance(index, hnswlib.Index):
+        index.set_ef(max(HNSW_EF_SEARCH, k))
+        labels, distances = index.knn_query(query_embedding, k)
+        # hnswlib's "ip" space reports 1 - inner product
+        return labels[0].astype(np.int64), 1.0 - distances[0]
+
+    index.hnsw.efSearch = max(HNSW_EF_SEARCH, k)
+    scores, indices = index.search(query_embedding, k)
+    found = indices[0] >= 0  # faiss pads with -1 when fewer than k are reachable
+    return indices[0][found], scores[0][found]
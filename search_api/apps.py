@@ -9,3 +9,6 @@ class SearchApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "search_api"
     verbose_name = "Search API"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,107 @@
+"""
+In-process caches used by the search services.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple, Optional
+
+
+class CacheStats(NamedTuple):
+    """Snapshot of embedding cache statistics, see EmbeddingService.get_cache_info()."""
+
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+    hit_rate: float
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache.
+
+    Unlike functools.lru_cache it stores values as-is, so numpy arrays can be
+    cached and returned without converting them to hashable tuples. Hit/miss
+    counters mirror lru_cache's cache_info().
+    """
+
+    def __init__(self, maxsize: int = 1000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value and mark it as recently used, or None on a miss."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """Insert a value, evicting the least recently used entry when full."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries and reset statistics."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class ShardedLRUCache:
+    """
+    LRU cache split into independently locked shards.
+
+    Keys are spread across shards by hash, so concurrent requests for
+    different keys don't serialize on one lock. Eviction is LRU within a
+    shard, which approximates global LRU order. Exposes the same interface
+    and aggregated statistics as LRUCache.
+    """
+
+    def __init__(self, maxsize: int = 1000, num_shards: int = 16):
+        self.maxsize = maxsize
+        shard_size = -(-maxsize // num_shards)  # ceil, so total capacity is at least maxsize
+        self._shards = [LRUCache(maxsize=shard_size) for _ in range(num_shards)]
+
+    def _shard(self, key: Hashable) -> LRUCache:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value and mark it as recently used, or None on a miss."""
+        return self._shard(key).get(key)
+
+    def put(self, key: Hashable, value: Any):
+        """Insert a value, evicting the least recently used entry of its shard when full."""
+        self._shard(key).put(key, value)
+
+    def clear(self):
+        """Drop all entries and reset statistics."""
+        for shard in self._shards:
+            shard.clear()
+
+    @property
+    def hits(self) -> int:
+        return sum(shard.hits for shard in self._shards)
+
+    @property
+    def misses(self) -> int:
+        return sum(shard.misses for shard in self._shards)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
@@ -1,16 +1,65 @@
+import atexit
+import hashlib
 import json
 import logging
-from functools import lru_cache
-from typing import Dict, List, Optional
+import os
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
 
 import numpy as np
+import torch
 from django.conf import settings
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+from tqdm.autonotebook import trange
+
+from . import ann
+from .cache import CacheStats, ShardedLRUCache
+from .models import Document
+
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
+try:
+    from .kernels import float_top_k, int8_dot_scores
+    from .kernels import warm_up as warm_up_kernels
+except ImportError:
+    float_top_k = int8_dot_scores = warm_up_kernels = None
 
 logger = logging.getLogger(__name__)
 
 
+def _aligned_empty(shape: Tuple[int, ...], dtype, alignment: int = 64) -> np.ndarray:
+    """
+    np.empty whose data starts on an `alignment`-byte boundary.
+
+    numpy only guarantees 16-byte alignment; starting the document matrix on a
+    cache line lets SIMD kernels use aligned loads and keeps rows (384 floats,
+    a multiple of 64 bytes) from straddling cache lines.
+    """
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    buffer = np.empty(nbytes + alignment, dtype=np.uint8)
+    offset = -buffer.ctypes.data % alignment
+    return buffer[offset : offset + nbytes].view(dtype).reshape(shape)
+
+
+class DocMatrix(NamedTuple):
+    """
+    All document embeddings held in memory for scoring.
+
+    Row i of `matrix` belongs to doc_ids[i]. The matrix holds unit-normalized
+    float32 rows, or int8 codes with per-row `scales` when int8 scoring is on.
+    `ann_index` is an approximate index over the float rows (see ann.py), if any.
+    """
+
+    doc_ids: List[str]
+    matrix: np.ndarray
+    scales: Optional[np.ndarray] = None
+    ann_index: Optional[Any] = None
+
+
 class EmbeddingService:
     """
     Singleton service for managing embeddings.
@@ -21,6 +70,14 @@ class EmbeddingService:
 
     _instance = None
     _model = None
+    _model_lock = threading.Lock()
+    _cache = ShardedLRUCache(maxsize=settings.EMBEDDING_CACHE_SIZE)
+    _doc_matrix = None
+    _doc_matrix_lock = threading.Lock()
+    _doc_matrix_generation = 0
+    _doc_matrix_stamp = None
+    _kernels_warm = False
+    _pool = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -29,91 +86,151 @@ class EmbeddingService:
 
     def __init__(self):
         if self._model is None:
-            self._load_model()
+            # concurrent first requests must not each load their own copy of the weights
+            with EmbeddingService._model_lock:
+                if self._model is None:
+                    self._load_model()
 
     def _load_model(self):
-        """Load the sentence transformer model."""
+        """Load the sentence transformer model, on the GPU in bf16/fp16 when one is available."""
         try:
-            logger.info(f"Loading embedding model: {settings.EMBEDDING_MODEL_NAME}")
-            self._model = SentenceTransformer(settings.EMBEDDING_MODEL_NAME)
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+            logger.info(f"Loading embedding model: {settings.EMBEDDING_MODEL_NAME} on {device}")
+            self._model = SentenceTransformer(settings.EMBEDDING_MODEL_NAME, device=device)
+            if device == "cuda":
+                # half-precision weights run on tensor cores; bf16 where supported (Ampere+) keeps
+                # fp32's exponent range, so activations can't overflow the way fp16 ones can
+                dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+                self._model.to(dtype)
             logger.info("Embedding model loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load embedding model: {e}")
             raise
 
-    @lru_cache(maxsize=1000)
-    def _embed_cached(self, text: str, query_id: Optional[str] = None) -> tuple:
+    def _embed_cached(self, text: str) -> np.ndarray:
         """
         Generate sentence embedding with caching.
 
-        Caches by both text and query_id. If query_id is provided, it becomes
-        part of the cache key, allowing the same text with different query_ids
-        to be cached separately.
+        The cache is keyed by text content only, so the same text is embedded
+        once no matter how many query_ids it is requested under. Variants that
+        tokenize identically (whitespace runs, and case for uncased tokenizers)
+        share one entry.
 
         Args:
             text: Input text to embed
-            query_id: Optional query identifier for cache key
 
         Returns:
-            tuple of embedding values
+            Read-only numpy array shared with the cache
         """
         if not text or not text.strip():
             raise ValueError("Text cannot be empty")
 
+        key = self._cache_key(text)
+        embedding = self._cache.get(key)
+        if embedding is not None:
+            return embedding
+
         try:
-            embedding = self._model.encode(text, convert_to_numpy=True)
-            # tuples are hashable, numpy arrays are not
-            return tuple(embedding.tolist())
+            with torch.inference_mode():
+                # fp16 models return float16, keep the float32 contract for callers
+                embedding = self._model.encode(key, convert_to_numpy=True).astype(np.float32, copy=False)
         except Exception as e:
             logger.error(f"Failed to embed text: {e}")
             raise
 
+        # every caller gets the same array, so make sure nobody mutates it in place
+        embedding.setflags(write=False)
+        self._cache.put(key, embedding)
+        return embedding
+
+    def _cache_key(self, text: str) -> str:
+        """Canonical form of text that the tokenizer maps to the same input ids."""
+        key = " ".join(text.split())
+        if getattr(self._model.tokenizer, "do_lower_case", False):
+            key = key.lower()
+        return key
+
     def embed_text(self, text: str, query_id: Optional[str] = None) -> np.ndarray:
         """
         Generate sentence embedding for a single text.
 
         Args:
             text: Input text to embed
-            query_id: Optional query identifier for caching by query_id
+            query_id: Optional query identifier; embeddings are cached by text only
 
         Returns:
-            numpy array of shape (embedding_dim,)
+            Read-only numpy array of shape (embedding_dim,)
+        """
+        return self._embed_cached(text)
+
+    def embed_texts(self, texts: List[str]) -> List[np.ndarray]:
         """
-        # get cached tuple and convert back to numpy array
-        embedding_tuple = self._embed_cached(text, query_id)
-        return np.array(embedding_tuple)
+        Generate cached sentence embeddings for several texts with one model call.
+
+        Texts already in the cache are served from it and the rest are encoded
+        together and cached, so the result matches embed_text() per text.
+
+        Args:
+            texts: Input texts to embed
+
+        Returns:
+            List of read-only numpy arrays of shape (embedding_dim,)
+        """
+        if any(not text or not text.strip() for text in texts):
+            raise ValueError("Text cannot be empty")
+
+        keys = [self._cache_key(text) for text in texts]
+        embeddings = {key: self._cache.get(key) for key in keys}
+        missing = [key for key, embedding in embeddings.items() if embedding is None]
+
+        if missing:
+            try:
+                with torch.inference_mode():
+                    encoded = self._model.encode(missing, convert_to_numpy=True).astype(np.float32, copy=False)
+            except Exception as e:
+                logger.error(f"Failed to embed texts: {e}")
+                raise
+
+            for key, embedding in zip(missing, encoded):
+                embedding.setflags(write=False)
+                self._cache.put(key, embedding)
+                embeddings[key] = embedding
+
+        return [embeddings[key] for key in keys]
 
     def embed_query(self, query_text: str, query_id: str) -> np.ndarray:
         """
-        Generate embedding for a query with query_id-based caching.
+        Generate embedding for a query.
 
-        This method is specifically for queries where you want to cache
-        by query_id rather than just text content.
+        The embedding is cached by text, so queries sharing a text share one
+        cache entry whatever their query_id.
 
         Args:
             query_text: Query text to embed
-            query_id: Query identifier (becomes part of cache key)
+            query_id: Query identifier
 
         Returns:
             numpy array of shape (embedding_dim,)
         """
         return self.embed_text(query_text, query_id=query_id)
 
-    def embed_batch(self, texts: List[str], max_length: int = 512) -> np.ndarray:
+    def embed_batch(self, texts: List[str], max_length: int = 512, batch_size: int = 256) -> np.ndarray:
         """
-        Generate sentence embeddings for a batch of texts.
+        Generate unit-normalized sentence embeddings for a batch of texts.
 
         Notes:
-            - Automatically truncates texts longer than `max_length` tokens to avoid model context overflow.
+            - Automatically truncates texts longer than `max_length` tokens (capped at the model's
+              max_seq_length) to avoid model context overflow.
             - Batch embedding bypasses cache for efficiency.
             - Use embed_text() or embed_query() for cached individual embeddings.
 
         Args:
             texts: List of texts to embed.
             max_length: Maximum allowed number of tokens (depends on model).
+            batch_size: Number of texts per model forward pass.
 
         Returns:
-            numpy array of shape (num_texts, embedding_dim)
+            float32 numpy array of shape (num_texts, embedding_dim), rows with unit L2 norm
         """
         if not texts:
             raise ValueError("Text list cannot be empty")
@@ -127,94 +244,589 @@ class EmbeddingService:
         except AttributeError:
             raise RuntimeError("The model does not expose a tokenizer for token-level truncation.")
 
-        truncated_texts = []
-        num_truncated = 0
-
-        for text in valid_texts:
-            tokens = tokenizer.encode(text, add_special_tokens=False)
-            if len(tokens) > max_length:
-                num_truncated += 1
-                tokens = tokens[:max_length]
-                truncated_text = tokenizer.decode(tokens, skip_special_tokens=True)
-            else:
-                truncated_text = text
-            truncated_texts.append(truncated_text)
+        # the model truncates to max_seq_length itself, so tokens past that never reach it anyway
+        max_length = min(max_length, self._model.max_seq_length)
 
+        # tokenize once; the ids go straight into the transformer instead of being
+        # decoded back to text for model.encode() to tokenize again
+        encoded = tokenizer(valid_texts, truncation=True, max_length=max_length)
+        num_truncated = sum(1 for encoding in encoded.encodings if encoding.overflowing)
         if num_truncated:
             logger.warning(f"Truncated {num_truncated} texts exceeding {max_length} tokens.")
 
+        pool = self._get_cpu_pool() if len(valid_texts) > batch_size else None
+        if pool is not None:
+            # workers tokenize for themselves, so hand them text already cut to max_length
+            texts_to_encode = list(valid_texts)
+            overflowing = [i for i, encoding in enumerate(encoded.encodings) if encoding.overflowing]
+            decoded = tokenizer.batch_decode([encoded["input_ids"][i] for i in overflowing], skip_special_tokens=True)
+            for i, text in zip(overflowing, decoded):
+                texts_to_encode[i] = text
+
+            try:
+                embeddings = self._model.encode_multi_process(
+                    texts_to_encode, pool, batch_size=batch_size, normalize_embeddings=True
+                )
+                return embeddings.astype(np.float32, copy=False)
+            except Exception as e:
+                logger.error(f"Failed to embed batch of {len(valid_texts)} texts: {e}")
+                raise
+
+        # longest first, so each batch pads to similar lengths
+        order = sorted(range(len(valid_texts)), key=lambda i: -len(encoded["input_ids"][i]))
+        embeddings = np.empty((len(valid_texts), self._model.get_sentence_embedding_dimension()), dtype=np.float32)
+
         try:
-            embeddings = self._model.encode(
-                truncated_texts,
-                convert_to_numpy=True,
-                show_progress_bar=True,
-                batch_size=32,
-            )
+            with torch.inference_mode():
+                for start in trange(0, len(order), batch_size, desc="Batches"):
+                    batch = order[start : start + batch_size]
+                    features = tokenizer.pad(
+                        {key: [encoded[key][i] for i in batch] for key in encoded.keys()}, return_tensors="pt"
+                    )
+                    features = {key: value.to(self._model.device) for key, value in features.items()}
+                    features = self._model[0](features)
+                    # pool and normalize in fp32 even when the transformer ran in half precision
+                    features["token_embeddings"] = features["token_embeddings"].float()
+                    for module in list(self._model)[1:]:
+                        features = module(features)
+                    output = features["sentence_embedding"]
+                    embeddings[batch] = torch.nn.functional.normalize(output, dim=-1).cpu().numpy()
             return embeddings
         except Exception as e:
             logger.error(f"Failed to embed batch of {len(valid_texts)} texts: {e}")
             raise
 
+    def _get_cpu_pool(self) -> Optional[Dict]:
+        """
+        Return the CPU worker pool for embed_batch, starting it on first use.
+
+        Returns None on GPU or when EMBEDDING_CPU_WORKERS is below 2.
+        """
+        if settings.EMBEDDING_CPU_WORKERS < 2 or self._model.device.type != "cpu":
+            return None
+
+        if EmbeddingService._pool is None:
+            logger.info(f"Starting {settings.EMBEDDING_CPU_WORKERS} CPU embedding worker processes")
+            EmbeddingService._pool = self._model.start_multi_process_pool(["cpu"] * settings.EMBEDDING_CPU_WORKERS)
+            atexit.register(SentenceTransformer.stop_multi_process_pool, EmbeddingService._pool)
+        return EmbeddingService._pool
+
     def compute_cosine_similarity(self, query_embedding: np.ndarray, doc_embeddings: np.ndarray) -> np.ndarray:
         """
         Compute cosine similarity between query and document embeddings.
 
+        Document embeddings are stored unit-normalized (see normalize_embeddings),
+        so only the query needs normalizing and cosine reduces to a single
+        matrix-vector product.
+
         Args:
             query_embedding: Query embedding of shape (embedding_dim,)
-            doc_embeddings: Document embeddings of shape (num_docs, embedding_dim)
+            doc_embeddings: Unit-normalized document embeddings of shape (num_docs, embedding_dim)
 
         Returns:
             Similarity scores of shape (num_docs,)
         """
-        # Reshape query embedding to (1, embedding_dim)
-        query_embedding = query_embedding.reshape(1, -1)  # 384
-
-        # Compute cosine similarity
-        similarities = cosine_similarity(query_embedding, doc_embeddings)
-
-        # Return as 1D array
-        return similarities[0]
-
-    def get_cache_info(self) -> Dict:
-        """Get cache statistics from lru_cache."""
-        cache_info = self._embed_cached.cache_info()
-        return {
-            "hits": cache_info.hits,
-            "misses": cache_info.misses,
-            "size": cache_info.currsize,
-            "maxsize": cache_info.maxsize,
-            "hit_rate": (
-                cache_info.hits / (cache_info.hits + cache_info.misses) if (cache_info.hits + cache_info.misses) > 0 else 0
-            ),
+        query_embedding = self.normalize_embeddings(np.asarray(query_embedding, dtype=np.float32))
+        # C-contiguous float32 lets numpy hand this straight to BLAS sgemv
+        doc_embeddings = np.ascontiguousarray(doc_embeddings, dtype=np.float32)
+
+        return doc_embeddings @ query_embedding
+
+    def compute_int8_similarity(
+        self, query_embedding: np.ndarray, doc_codes: np.ndarray, doc_scales: np.ndarray
+    ) -> np.ndarray:
+        """
+        Approximate cosine similarity against int8-quantized document embeddings.
+
+        The query is normalized and quantized the same way as the documents, the
+        integer dot products are computed with simsimd's int8 kernels (VNNI/NEON
+        where available), or a numba kernel without simsimd, and rescaled by
+        both per-vector scales.
+
+        Args:
+            query_embedding: Query embedding of shape (embedding_dim,)
+            doc_codes: int8 document codes of shape (num_docs, embedding_dim)
+            doc_scales: Per-document dequantization scales of shape (num_docs,)
+
+        Returns:
+            Similarity scores of shape (num_docs,)
+        """
+        query_codes, query_scale = self.quantize_embeddings(self.normalize_embeddings(query_embedding))
+        doc_codes = np.ascontiguousarray(doc_codes, dtype=np.int8)
+
+        if simsimd is not None:
+            dots = np.asarray(simsimd.cdist(query_codes.reshape(1, -1), doc_codes, metric="dot"))[0]
+        elif int8_dot_scores is not None:
+            doc_scales = np.ascontiguousarray(doc_scales, dtype=np.float32)
+            return int8_dot_scores(doc_codes, doc_scales, query_codes, np.float32(query_scale))
+        else:
+            # |sum| <= 127 * 127 * dim stays below 2**24, so float32 accumulation is exact
+            dots = doc_codes.astype(np.float32) @ query_codes.astype(np.float32)
+
+        return dots * doc_scales * query_scale
+
+    def score_documents(self, query_embedding: np.ndarray, doc_matrix: DocMatrix) -> np.ndarray:
+        """
+        Score a query against every document in the matrix.
+
+        Args:
+            query_embedding: Query embedding of shape (embedding_dim,)
+            doc_matrix: Document matrix from get_doc_matrix()
+
+        Returns:
+            Similarity scores of shape (num_docs,), aligned with doc_matrix.doc_ids
+        """
+        if doc_matrix.scales is not None:
+            return self.compute_int8_similarity(query_embedding, doc_matrix.matrix, doc_matrix.scales)
+        return self.compute_cosine_similarity(query_embedding, doc_matrix.matrix)
+
+    def top_k(self, query_embedding: np.ndarray, k: int, doc_matrix: DocMatrix) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k highest-scoring documents for a query.
+
+        Only the k best scores are sorted: argpartition selects them in O(N)
+        instead of argsorting all N scores. With numba, float matrices use a
+        fused kernel that never materializes the N scores. When the matrix
+        carries an ANN index the search is approximate and sub-linear instead.
+
+        Args:
+            query_embedding: Query embedding of shape (embedding_dim,)
+            k: Number of documents to return
+            doc_matrix: Document matrix from get_doc_matrix()
+
+        Returns:
+            Tuple of (row indices, scores), both of shape (min(k, num_docs),) and best first
+        """
+        if doc_matrix.ann_index is not None and k < len(doc_matrix.doc_ids):
+            return ann.search(doc_matrix.ann_index, self.normalize_embeddings(query_embedding), k)
+
+        if float_top_k is not None and doc_matrix.scales is None and 0 < k < len(doc_matrix.doc_ids):
+            query = self.normalize_embeddings(np.asarray(query_embedding, dtype=np.float32))
+            return float_top_k(np.ascontiguousarray(doc_matrix.matrix, dtype=np.float32), query, k)
+
+        scores = self.score_documents(query_embedding, doc_matrix)
+        k = max(0, min(k, len(scores)))
+
+        if k < len(scores):
+            indices = np.argpartition(-scores, k)[:k]
+        else:
+            indices = np.arange(len(scores))
+        indices = indices[np.argsort(-scores[indices], kind="stable")]
+
+        return indices, scores[indices]
+
+    def top_k_batch(
+        self, query_embeddings: List[np.ndarray], k: int, doc_matrix: DocMatrix
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Find the k highest-scoring documents for each of several queries.
+
+        On the exact float path all queries are scored with one (B, d) x (d, N)
+        product, which streams the document matrix once instead of once per
+        query. ANN and int8 matrices fall back to top_k() per query.
+
+        Args:
+            query_embeddings: Query embeddings of shape (embedding_dim,)
+            k: Number of documents to return per query
+            doc_matrix: Document matrix from get_doc_matrix()
+
+        Returns:
+            List of (row indices, scores) tuples as returned by top_k(), in query order
+        """
+        num_docs = len(doc_matrix.doc_ids)
+        if doc_matrix.ann_index is not None or doc_matrix.scales is not None or len(query_embeddings) < 2:
+            return [self.top_k(query_embedding, k, doc_matrix) for query_embedding in query_embeddings]
+
+        queries = self.normalize_embeddings(np.asarray(query_embeddings, dtype=np.float32))
+        scores = queries @ np.ascontiguousarray(doc_matrix.matrix, dtype=np.float32).T
+        k = max(0, min(k, num_docs))
+
+        if k < num_docs:
+            indices = np.argpartition(-scores, k, axis=1)[:, :k]
+        else:
+            indices = np.broadcast_to(np.arange(num_docs), scores.shape)
+
+        results = []
+        for row_scores, row_indices in zip(scores, indices):
+            row_indices = row_indices[np.argsort(-row_scores[row_indices], kind="stable")]
+            results.append((row_indices, row_scores[row_indices]))
+        return results
+
+    def get_doc_matrix(self) -> DocMatrix:
+        """
+        Return the in-memory document matrix, loading it on first use.
+
+        The matrix saved by the indexer is memory-mapped when it still matches
+        the database, otherwise it is rebuilt from the Document table.
+        """
+        doc_matrix = EmbeddingService._doc_matrix
+        stamp = self.saved_doc_matrix_stamp()
+        if self._is_current(doc_matrix, stamp):
+            return doc_matrix
+
+        # one thread loads while concurrent first requests wait for its result
+        with EmbeddingService._doc_matrix_lock:
+            doc_matrix = EmbeddingService._doc_matrix
+            if self._is_current(doc_matrix, stamp):
+                return doc_matrix
+
+            if not EmbeddingService._kernels_warm:
+                self._warm_kernels()
+
+            generation = EmbeddingService._doc_matrix_generation
+            doc_matrix = self._load_saved_doc_matrix() or self.load_doc_matrix()
+            EmbeddingService._doc_matrix_stamp = stamp
+
+            if settings.DEBUG and doc_matrix.scales is None and len(doc_matrix.matrix):
+                # compute_cosine_similarity is a bare dot product, which is only cosine for unit rows;
+                # the loaders already published the matrix, so take it back before failing
+                norms = np.linalg.norm(doc_matrix.matrix, axis=1)
+                if not np.allclose(norms, 1.0, atol=1e-2):
+                    EmbeddingService._doc_matrix = None
+                    raise AssertionError("Stored document embeddings are not unit-normalized")
+
+            if generation != EmbeddingService._doc_matrix_generation:
+                # documents changed while loading, serve this one but reload next time
+                EmbeddingService._doc_matrix = None
+
+        return doc_matrix
+
+    @staticmethod
+    def _warm_kernels():
+        """
+        Compile the numba kernels before the first search in this process.
+
+        This runs with the first doc matrix load, in the worker, so a server
+        that forks after importing the app never starts numba's thread pool in
+        the parent. Without a thread-safe threading layer the kernels are
+        disabled and search falls back to numpy.
+        """
+        global float_top_k, int8_dot_scores
+
+        EmbeddingService._kernels_warm = True
+        if warm_up_kernels is None:
+            return
+        try:
+            warm_up_kernels()
+        except ValueError as e:
+            logger.warning(f"numba kernels disabled, no thread-safe threading layer: {str(e).splitlines()[0]}")
+            float_top_k = int8_dot_scores = None
+
+    @staticmethod
+    def _is_current(doc_matrix: Optional[DocMatrix], stamp: Optional[Tuple[int, int]]) -> bool:
+        """Whether a cached matrix can be served as-is by get_doc_matrix()."""
+        if doc_matrix is None or (doc_matrix.scales is not None) != settings.EMBEDDING_INT8_SCORING:
+            return False
+        if stamp != EmbeddingService._doc_matrix_stamp:
+            # the saved matrix was rewritten or discarded, possibly by another process
+            return False
+        # an empty matrix may predate an `init` run in another process, whose writes send
+        # this process no signals; re-checking only while empty keeps warm requests query-free
+        return bool(doc_matrix.doc_ids) or not Document.objects.exists()
+
+    def load_doc_matrix(self) -> DocMatrix:
+        """
+        Build the document matrix from the database and keep it in memory.
+
+        Returns:
+            DocMatrix with a contiguous (num_docs, embedding_dim) matrix
+        """
+        dim = self._model.get_sentence_embedding_dimension()
+        int8 = settings.EMBEDDING_INT8_SCORING
+        dtype = np.int8 if int8 else np.float32
+
+        # rows stream from the cursor straight into the matrix instead of being fetched as
+        # one list of blobs first; count() sizes it, growing if rows arrive in between
+        capacity = Document.objects.count()
+        matrix = _aligned_empty((capacity, dim), dtype)
+        scales = np.empty(capacity, dtype=np.float32) if int8 else None
+        doc_ids = []
+        unquantized = {}  # pk -> row of documents saved without embedding_int8
+
+        rows = Document.objects.values_list("pk", "doc_id", "embedding_int8" if int8 else "embedding")
+        for i, (pk, doc_id, blob) in enumerate(rows.iterator(chunk_size=10000)):
+            if i == capacity:
+                capacity = max(2 * capacity, 1024)
+                grown = _aligned_empty((capacity, dim), dtype)
+                grown[:i] = matrix
+                matrix = grown
+                if int8:
+                    scales = np.resize(scales, capacity)
+
+            doc_ids.append(doc_id)
+            if int8 and not blob:
+                unquantized[pk] = i
+                matrix[i], scales[i] = 0, 0.0  # filled below, scores 0 if the row is gone by then
+            elif int8:
+                matrix[i], scales[i] = self.deserialize_embedding_int8(blob)
+            else:
+                # assigning the float16 view casts straight into the row, no float32 temporary
+                matrix[i] = np.frombuffer(blob, dtype=np.float16)
+
+        if unquantized:
+            # embedding_int8 has a default, so documents created without it hold b""; quantize
+            # their float16 embedding instead, fetched in chunks under SQLite's variable limit
+            logger.warning(f"Quantizing {len(unquantized)} document embeddings stored without int8 codes")
+            pks = list(unquantized)
+            for start in range(0, len(pks), 500):
+                for pk, blob in Document.objects.filter(pk__in=pks[start : start + 500]).values_list("pk", "embedding"):
+                    embedding = self.normalize_embeddings(self.deserialize_embedding(blob))
+                    matrix[unquantized[pk]], scales[unquantized[pk]] = self.quantize_embeddings(embedding)
+
+        matrix = matrix[: len(doc_ids)]
+        if int8:
+            scales = scales[: len(doc_ids)]
+        else:
+            # rows stored before embeddings were unit-normalized are fixed once here,
+            # so scoring stays a bare dot product instead of dividing by norms per query
+            stale = np.abs(np.linalg.norm(matrix, axis=1) - 1.0) > 1e-2
+            if stale.any():
+                logger.warning(f"Normalizing {int(stale.sum())} document embeddings that are not unit length")
+                matrix[stale] = self.normalize_embeddings(matrix[stale])
+
+        doc_matrix = DocMatrix(doc_ids, matrix, scales)
+        EmbeddingService._doc_matrix = doc_matrix
+        logger.info(f"Loaded document matrix of shape {matrix.shape} from the database")
+        return doc_matrix
+
+    @staticmethod
+    def save_doc_matrix(doc_matrix: DocMatrix):
+        """
+        Persist the document matrix next to the dataset for memory-mapped loading.
+
+        Writes <DOC_MATRIX_PATH>.npy (matrix), .ids.npy, .scales.npy for int8 or
+        .ann when ANN_BACKEND is set and there are at least ANN_MIN_DOCUMENTS
+        documents, then a .json manifest with the shape and a checksum of the
+        doc ids. The manifest is removed first and written last, so an
+        interrupted save is never picked up.
+        """
+        manifest_path = settings.DOC_MATRIX_PATH + ".json"
+        arrays = {".npy": doc_matrix.matrix, ".ids.npy": np.array(doc_matrix.doc_ids)}
+        if doc_matrix.scales is not None:
+            arrays[".scales.npy"] = doc_matrix.scales
+
+        os.makedirs(os.path.dirname(settings.DOC_MATRIX_PATH), exist_ok=True)
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+
+        for suffix, array in arrays.items():
+            path = settings.DOC_MATRIX_PATH + suffix
+            with open(path + ".tmp", "wb") as f:
+                np.save(f, array)
+            os.replace(path + ".tmp", path)
+
+        manifest = {
+            "int8": doc_matrix.scales is not None,
+            "shape": list(doc_matrix.matrix.shape),
+            "checksum": EmbeddingService._doc_ids_checksum(doc_matrix.doc_ids),
         }
+        if doc_matrix.scales is None and len(doc_matrix.doc_ids) >= max(settings.ANN_MIN_DOCUMENTS, 1) and ann.enabled():
+            ann.write_index(ann.build_index(doc_matrix.matrix), settings.DOC_MATRIX_PATH + ".ann")
+            manifest["ann"] = settings.ANN_BACKEND
+        with open(manifest_path + ".tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+        logger.info(f"Saved document matrix of shape {doc_matrix.matrix.shape} to {settings.DOC_MATRIX_PATH}.npy")
+
+    def _load_saved_doc_matrix(self) -> Optional[DocMatrix]:
+        """Memory-map the saved document matrix, or return None if it is missing or stale."""
+        matrix_path = settings.DOC_MATRIX_PATH + ".npy"
+        int8 = settings.EMBEDDING_INT8_SCORING
+
+        try:
+            with open(settings.DOC_MATRIX_PATH + ".json") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        if manifest["int8"] != int8:
+            return None
+
+        try:
+            matrix = np.load(matrix_path, mmap_mode="r")
+            doc_ids = np.load(settings.DOC_MATRIX_PATH + ".ids.npy").tolist()
+            scales = np.load(settings.DOC_MATRIX_PATH + ".scales.npy") if int8 else None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable saved document matrix: {e}")
+            return None
+
+        checksum = self._doc_ids_checksum(doc_ids)
+        if list(matrix.shape) != manifest["shape"] or checksum != manifest["checksum"]:
+            logger.warning("Saved document matrix files do not match their manifest, ignoring them")
+            return None
+
+        if checksum != self._doc_ids_checksum(Document.objects.values_list("doc_id", flat=True)):
+            logger.info("Saved document matrix is out of date, rebuilding from the database")
+            return None
+
+        ann_index = None
+        if not int8 and manifest.get("ann") and manifest["ann"] == settings.ANN_BACKEND and ann.enabled():
+            ann_index = ann.read_index(settings.DOC_MATRIX_PATH + ".ann", matrix.shape[1])
+
+        doc_matrix = DocMatrix(doc_ids, matrix, scales, ann_index)
+        EmbeddingService._doc_matrix = doc_matrix
+        logger.info(f"Memory-mapped document matrix of shape {matrix.shape} from {matrix_path}")
+        return doc_matrix
+
+    @staticmethod
+    def _doc_ids_checksum(doc_ids: Iterable[str]) -> str:
+        """SHA-1 of the doc ids in order, identifying which rows a saved matrix holds."""
+        digest = hashlib.sha1()
+        for doc_id in doc_ids:
+            digest.update(doc_id.encode())
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    @staticmethod
+    def saved_doc_matrix_stamp() -> Optional[Tuple[int, int]]:
+        """
+        Inode and mtime of the saved matrix's manifest, or None if there is none.
+
+        `init` writes the manifest after everything else it loads, and Document
+        signals remove it, so a changed stamp tells every process that the
+        indexed data changed. It costs one stat() instead of a database query.
+        """
+        try:
+            stat = os.stat(settings.DOC_MATRIX_PATH + ".json")
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    @staticmethod
+    def discard_saved_doc_matrix():
+        """
+        Remove the saved matrix's manifest so no process memory-maps it again.
+
+        The manifest's checksum covers the doc ids, not the embeddings, so an
+        update that keeps the ids would still match it. Searches rebuild from
+        the database until the indexer or rebuild_doc_matrix saves it again.
+        """
+        try:
+            os.remove(settings.DOC_MATRIX_PATH + ".json")
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def invalidate_doc_matrix(cls):
+        """Drop the in-memory document matrix so the next search reloads it."""
+        cls._doc_matrix = None
+        cls._doc_matrix_generation += 1
+
+    @classmethod
+    def invalidate_doc_matrix_if_stale(cls, num_docs: int):
+        """
+        Drop the in-memory document matrix if it does not hold num_docs rows.
+
+        Model signals only reach the process that wrote the documents, so this
+        catches a reindex run from another process while the server is up.
+        """
+        doc_matrix = cls._doc_matrix
+        if doc_matrix is not None and len(doc_matrix.doc_ids) != num_docs:
+            logger.info(f"Document count changed ({len(doc_matrix.doc_ids)} -> {num_docs}), reloading matrix")
+            cls.invalidate_doc_matrix()
+
+    def get_cache_info(self) -> CacheStats:
+        """Get embedding cache statistics; use ._asdict() where a dict is needed."""
+        hits, misses = self._cache.hits, self._cache.misses
+        return CacheStats(
+            hits=hits,
+            misses=misses,
+            size=len(self._cache),
+            maxsize=self._cache.maxsize,
+            hit_rate=hits / (hits + misses or 1),
+        )
 
     def clear_cache(self):
-        """Clear the LRU cache."""
-        self._embed_cached.cache_clear()
+        """Clear the embedding cache."""
+        self._cache.clear()
         logger.info("Embedding cache cleared")
 
     @staticmethod
-    def serialize_embedding(embedding: np.ndarray) -> str:
+    def normalize_embeddings(embeddings: np.ndarray) -> np.ndarray:
+        """
+        Scale embeddings to unit L2 norm.
+
+        Args:
+            embeddings: Array of shape (embedding_dim,) or (num_texts, embedding_dim)
+
+        Returns:
+            New array of the same shape with every vector normalized; all-zero
+            vectors stay zero instead of turning into NaN
+        """
+        return embeddings / np.linalg.norm(embeddings, axis=-1, keepdims=True).clip(min=1e-12)
+
+    @staticmethod
+    def quantize_embeddings(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Symmetric per-vector int8 quantization.
+
+        Each vector is scaled so its largest component maps to +/-127; the
+        vector is recovered (approximately) as codes * scale.
+
+        Args:
+            embeddings: Array of shape (embedding_dim,) or (num_texts, embedding_dim)
+
+        Returns:
+            Tuple of (int8 codes with the input shape, float32 scales with the batch shape)
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        # round the scale to float16 first since that is how it gets stored
+        scales = (np.abs(embeddings).max(axis=-1) / 127).astype(np.float16).astype(np.float32)
+        safe_scales = np.where(scales > 0, scales, 1.0)
+        codes = np.round(embeddings / np.expand_dims(safe_scales, -1)).clip(-127, 127).astype(np.int8)
+        return codes, scales
+
+    @staticmethod
+    def serialize_embedding_int8(embedding: np.ndarray) -> bytes:
+        """
+        Serialize numpy array to int8 codes prefixed by a float16 scale.
+
+        Args:
+            embedding: Numpy array of shape (embedding_dim,)
+
+        Returns:
+            2 scale bytes followed by embedding_dim int8 codes
+        """
+        codes, scale = EmbeddingService.quantize_embeddings(embedding)
+        return scale.astype(np.float16).tobytes() + codes.tobytes()
+
+    @staticmethod
+    def deserialize_embedding_int8(embedding_bytes: bytes) -> Tuple[np.ndarray, float]:
+        """
+        Deserialize int8 codes and their float16 scale.
+
+        Args:
+            embedding_bytes: Bytes produced by serialize_embedding_int8
+
+        Returns:
+            Tuple of (int8 codes, scale)
+        """
+        scale = float(np.frombuffer(embedding_bytes, dtype=np.float16, count=1)[0])
+        codes = np.frombuffer(embedding_bytes, dtype=np.int8, offset=2)
+        return codes, scale
+
+    @staticmethod
+    def serialize_embedding(embedding: np.ndarray) -> bytes:
         """
-        Serialize numpy array to JSON string for database storage.
+        Serialize numpy array to packed float16 bytes for database storage.
 
         Args:
             embedding: Numpy array
 
         Returns:
-            JSON string representation
+            Raw float16 bytes (2 bytes per dimension)
         """
-        return json.dumps(embedding.tolist())
+        return embedding.astype(np.float16, copy=False).tobytes()
 
     @staticmethod
-    def deserialize_embedding(embedding_str: str) -> np.ndarray:
+    def deserialize_embedding(embedding_bytes: bytes) -> np.ndarray:
         """
-        Deserialize JSON string back to numpy array.
+        Deserialize packed float16 bytes back to numpy array.
 
         Args:
-            embedding_str: JSON string
+            embedding_bytes: Raw float16 bytes (or memoryview, depending on the DB backend)
 
         Returns:
-            Numpy array
+            float32 numpy array
         """
-        return np.array(json.loads(embedding_str))
+        return np.frombuffer(embedding_bytes, dtype=np.float16).astype(np.float32)
@@ -0,0 +1,91 @@
+"""
+Numba-compiled scoring kernels.
+
+int8_dot_scores is used when simsimd is not installed, so int8 scoring does
+not have to widen the whole code matrix to float32 on every query.
+float_top_k fuses float32 scoring with top-k selection for the exact search.
+
+The kernels run on concurrent request threads. numba's workqueue threading
+layer aborts the process when two parallel regions launch at once, so only
+the thread-safe layers (TBB or OpenMP) are accepted. If neither is available
+the first call raises ValueError; warm_up() makes that call up front.
+
+Both kernels compile (or load from numba's cache) on their first call rather
+than at import. numba starts its thread pool at that point, and a process
+that forks workers after importing this module (gunicorn --preload) must not
+have one running: GNU OpenMP aborts in the forked child and TBB hangs the
+parent at exit. Read-only memmaps of the saved doc matrix get their own
+specialization on first use.
+"""
+
+import numba
+import numpy as np
+from numba import njit, prange
+
+numba.config.THREADING_LAYER = "threadsafe"
+
+# fastmath without "ninf"/"nnan": float_top_k uses -inf for empty top-k slots
+_FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+
+@njit(fastmath=_FASTMATH, parallel=True, cache=True)
+def int8_dot_scores(doc_codes, doc_scales, query_codes, query_scale):
+    """
+    Rescaled int8 dot products of every document row with the query.
+
+    Rows are spread across cores; the inner loop accumulates in int32, which
+    LLVM vectorizes.
+    """
+    num_docs, dim = doc_codes.shape
+    scores = np.empty(num_docs, dtype=np.float32)
+    for i in prange(num_docs):
+        acc = np.int32(0)
+        for j in range(dim):
+            acc += np.int32(doc_codes[i, j]) * np.int32(query_codes[j])
+        scores[i] = np.float32(acc) * doc_scales[i] * query_scale
+    return scores
+
+
+@njit(fastmath=_FASTMATH, parallel=True, cache=True)
+def float_top_k(doc_matrix, query, k):
+    """
+    Fused dot product and top-k selection over float32 rows.
+
+    Each chunk of rows keeps its own k best in a small array while scoring,
+    so the N scores are never written out; the per-chunk winners are merged
+    at the end. Returns (row indices, scores), best first.
+    """
+    num_docs, dim = doc_matrix.shape
+    num_chunks = min(max(num_docs // 4096, 1), 256)
+    chunk_size = (num_docs + num_chunks - 1) // num_chunks
+    best_scores = np.full((num_chunks, k), -np.inf, dtype=np.float32)
+    best_indices = np.full((num_chunks, k), -1, dtype=np.int64)
+
+    for c in prange(num_chunks):
+        worst = 0  # slot holding the chunk's current k-th best score
+        for i in range(c * chunk_size, min((c + 1) * chunk_size, num_docs)):
+            acc = np.float32(0.0)
+            for j in range(dim):
+                acc += doc_matrix[i, j] * query[j]
+            if acc > best_scores[c, worst]:
+                best_scores[c, worst] = acc
+                best_indices[c, worst] = i
+                for t in range(k):
+                    if best_scores[c, t] < best_scores[c, worst]:
+                        worst = t
+
+    scores = best_scores.ravel()
+    indices = best_indices.ravel()
+    order = np.argsort(-scores)[:k]
+    return indices[order], scores[order]
+
+
+def warm_up() -> None:
+    """
+    Compile both kernels and start numba's thread pool in this process.
+
+    Raises:
+        ValueError: If neither the TBB nor the OpenMP threading layer is available
+    """
+    float_top_k(np.zeros((1, 1), dtype=np.float32), np.zeros(1, dtype=np.float32), 1)
+    int8_dot_scores(np.zeros((1, 1), dtype=np.int8), np.zeros(1, dtype=np.float32), np.zeros(1, dtype=np.int8), np.float32(1))
@@ -0,0 +1,34 @@
+"""
+Django management command to rewrite the saved document matrix.
+
+Usage:
+    python manage.py rebuild_doc_matrix
+
+The indexer saves the matrix after `init`, and the API memory-maps it at
+startup as long as it matches the Document table. Run this after documents
+were changed some other way, so server processes map the file again instead
+of each rebuilding the matrix from the database.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from search_api.embedding_service import EmbeddingService
+
+
+class Command(BaseCommand):
+    """Management command to rebuild the saved document matrix from the database."""
+
+    help = "Rebuild the memory-mapped document matrix from the Document table"
+
+    def handle(self, *args, **options):
+        embedding_service = EmbeddingService()
+
+        doc_matrix = embedding_service.load_doc_matrix()
+        embedding_service.save_doc_matrix(doc_matrix)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Saved document matrix of {len(doc_matrix.doc_ids)} documents to {settings.DOC_MATRIX_PATH}.npy"
+            )
+        )
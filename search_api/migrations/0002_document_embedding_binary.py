@@ -0,0 +1,52 @@
+# Generated by Django 5.1 on 2026-10-15 09:12
+
+import json
+
+import numpy as np
+from django.db import migrations, models
+
+
+def json_to_float16(apps, schema_editor):
+    Document = apps.get_model("search_api", "Document")
+    for doc in Document.objects.only("embedding").iterator():
+        doc.embedding_blob = np.asarray(json.loads(doc.embedding), dtype=np.float16).tobytes()
+        doc.save(update_fields=["embedding_blob"])
+
+
+def float16_to_json(apps, schema_editor):
+    Document = apps.get_model("search_api", "Document")
+    for doc in Document.objects.only("embedding_blob").iterator():
+        doc.embedding = json.dumps(np.frombuffer(doc.embedding_blob, dtype=np.float16).tolist())
+        doc.save(update_fields=["embedding"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search_api", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="document",
+            name="embedding_blob",
+            field=models.BinaryField(default=b""),
+            preserve_default=False,
+        ),
+        # Give the legacy column a default so unapplying can re-add it on a populated table
+        migrations.AlterField(
+            model_name="document",
+            name="embedding",
+            field=models.TextField(default=""),
+        ),
+        migrations.RunPython(json_to_float16, float16_to_json),
+        migrations.RemoveField(
+            model_name="document",
+            name="embedding",
+        ),
+        migrations.RenameField(
+            model_name="document",
+            old_name="embedding_blob",
+            new_name="embedding",
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1 on 2026-10-15 10:03
+
+import numpy as np
+from django.db import migrations
+
+
+def normalize_embeddings(apps, schema_editor):
+    Document = apps.get_model("search_api", "Document")
+    batch = []
+    for doc in Document.objects.only("embedding").iterator(chunk_size=1000):
+        embedding = np.frombuffer(doc.embedding, dtype=np.float16).astype(np.float32)
+        doc.embedding = (embedding / np.linalg.norm(embedding)).astype(np.float16).tobytes()
+        batch.append(doc)
+        if len(batch) >= 1000:
+            Document.objects.bulk_update(batch, ["embedding"])
+            batch = []
+    Document.objects.bulk_update(batch, ["embedding"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search_api", "0002_document_embedding_binary"),
+    ]
+
+    operations = [
+        # cosine scoring now assumes unit-length document vectors; not reversible, but harmless to keep
+        migrations.RunPython(normalize_embeddings, migrations.RunPython.noop),
+    ]
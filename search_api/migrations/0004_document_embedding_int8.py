@@ -0,0 +1,35 @@
+# Generated by Django 5.1 on 2026-10-15 04:44
+
+import numpy as np
+from django.db import migrations, models
+
+
+def quantize_existing(apps, schema_editor):
+    Document = apps.get_model("search_api", "Document")
+    batch = []
+    for doc in Document.objects.only("embedding").iterator(chunk_size=1000):
+        embedding = np.frombuffer(doc.embedding, dtype=np.float16).astype(np.float32)
+        scale = np.float16(np.abs(embedding).max() / 127)
+        codes = np.round(embedding / (np.float32(scale) or 1.0)).clip(-127, 127).astype(np.int8)
+        doc.embedding_int8 = scale.tobytes() + codes.tobytes()
+        batch.append(doc)
+        if len(batch) >= 1000:
+            Document.objects.bulk_update(batch, ["embedding_int8"])
+            batch = []
+    Document.objects.bulk_update(batch, ["embedding_int8"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search_api", "0003_normalize_document_embeddings"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="document",
+            name="embedding_int8",
+            field=models.BinaryField(default=b""),
+        ),
+        migrations.RunPython(quantize_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1 on 2026-10-15 05:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search_api", "0004_document_embedding_int8"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="queryrelevance",
+            name="search_api__query_i_af913b_idx",
+        ),
+        migrations.AlterUniqueTogether(
+            name="queryrelevance",
+            unique_together=set(),
+        ),
+        migrations.AlterField(
+            model_name="queryrelevance",
+            name="query_id",
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AddConstraint(
+            model_name="queryrelevance",
+            constraint=models.UniqueConstraint(fields=("query_id", "doc_id"), name="qrel_qid_did"),
+        ),
+    ]
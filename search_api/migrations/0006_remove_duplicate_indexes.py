@@ -0,0 +1,35 @@
+# Generated by Django 5.1 on 2026-10-15 05:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search_api", "0005_queryrelevance_unique_constraint"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="document",
+            name="search_api__doc_id_5c9a01_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="query",
+            name="search_api__query_i_ef79a9_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="queryrelevance",
+            name="search_api__doc_id_337050_idx",
+        ),
+        migrations.AlterField(
+            model_name="document",
+            name="doc_id",
+            field=models.CharField(max_length=100, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="query",
+            name="query_id",
+            field=models.CharField(max_length=100, unique=True),
+        ),
+    ]
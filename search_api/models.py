@@ -8,20 +8,21 @@ class Document(models.Model):
     Attributes:
         doc_id (str): Unique identifier for the document (e.g., "MED-1")
         text (str): Full text content of the document
-        embedding (str): JSON-serialized numpy array of the document embedding
+        embedding (bytes): Packed float16 bytes of the document embedding
+        embedding_int8 (bytes): int8-quantized copy of the embedding (float16 scale + codes),
+            read instead of `embedding` when EMBEDDING_INT8_SCORING is enabled; empty for
+            documents saved without it, which are quantized from `embedding` on load
         created_at (datetime): Timestamp when document was indexed
     """
 
-    doc_id = models.CharField(max_length=100, unique=True, db_index=True)
+    doc_id = models.CharField(max_length=100, unique=True)
     text = models.TextField()
-    embedding = models.TextField()
+    embedding = models.BinaryField()
+    embedding_int8 = models.BinaryField(default=b"")
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["doc_id"]
-        indexes = [
-            models.Index(fields=["doc_id"]),
-        ]
 
     def __str__(self):
         return f"Document({self.doc_id})"
@@ -37,15 +38,14 @@ class QueryRelevance(models.Model):
         relevance_score (int): Relevance score (typically 1, 2, or 3)
     """
 
-    query_id = models.CharField(max_length=100, db_index=True)
+    query_id = models.CharField(max_length=100)
     doc_id = models.CharField(max_length=100, db_index=True)
     relevance_score = models.IntegerField()
 
     class Meta:
-        unique_together = ["query_id", "doc_id"]
-        indexes = [
-            models.Index(fields=["query_id"]),
-            models.Index(fields=["doc_id"]),
+        constraints = [
+            # its (query_id, doc_id) btree also serves query_id lookups, no separate index needed
+            models.UniqueConstraint(fields=["query_id", "doc_id"], name="qrel_qid_did"),
         ]
 
     def __str__(self):
@@ -61,14 +61,11 @@ class Query(models.Model):
         query_text (str): Text of the query
     """
 
-    query_id = models.CharField(max_length=100, unique=True, db_index=True)
+    query_id = models.CharField(max_length=100, unique=True)
     query_text = models.TextField()
 
     class Meta:
         ordering = ["query_id"]
-        indexes = [
-            models.Index(fields=["query_id"]),
-        ]
 
     def __str__(self):
         return f"Query({self.query_id}: {self.query_text[:50]})"
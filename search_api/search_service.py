@@ -1,10 +1,13 @@
 import logging
-from typing import Dict, List, Tuple
+import threading
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, Tuple
 
 import numpy as np
 
-from .embedding_service import EmbeddingService
-from .models import Document, QueryRelevance
+from .cache import CacheStats
+from .embedding_service import DocMatrix, EmbeddingService
+from .models import QueryRelevance
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +15,12 @@ logger = logging.getLogger(__name__)
 class SearchService:
     """Service for performing search operations and evaluation."""
 
+    # {query_id: relevant doc_ids}, read from QueryRelevance once and shared by all instances,
+    # with the saved doc matrix stamp at load time
+    _qrels = None
+    _qrels_stamp = None
+    _qrels_lock = threading.Lock()
+
     def __init__(self):
         self.embedding_service = EmbeddingService()
 
@@ -27,36 +36,53 @@ class SearchService:
         Returns:
             Tuple of (top_doc_ids, metadata)
         """
-        if query_id:
-            query_embedding = self.embedding_service.embed_query(query_text, query_id)
-        else:
-            query_embedding = self.embedding_service.embed_text(query_text)
+        query_embedding = self.embedding_service.embed_text(query_text, query_id=query_id)
 
-        documents = Document.objects.all()  # cuz the amount of documents is small
+        doc_matrix = self.embedding_service.get_doc_matrix()
 
-        if not documents.exists():
+        if not doc_matrix.doc_ids:
             logger.warning("No documents found in database")
             return [], {}
 
-        doc_ids = []
-        doc_embeddings = []
+        top_indices, top_scores = self.embedding_service.top_k(query_embedding, top_k, doc_matrix)
+        return self._search_result(doc_matrix, top_indices, top_scores)
 
-        for doc in documents:
-            doc_ids.append(doc.doc_id)
-            embedding = self.embedding_service.deserialize_embedding(doc.embedding)
-            doc_embeddings.append(embedding)
+    def search_batch(self, queries: List[Tuple[str, str]], top_k: int = 10) -> List[Tuple[List[str], Dict[str, float]]]:
+        """
+        Search for several queries at once.
 
-        doc_embeddings = np.array(doc_embeddings)
+        The query embeddings come from one model call and the documents are
+        scored for all queries together, so a batch costs much less than the
+        same number of search() calls.
 
-        similarities = self.embedding_service.compute_cosine_similarity(query_embedding, doc_embeddings)
+        Args:
+            queries: (query_text, query_id) pairs; query_id may be None
+            top_k: Number of top documents to return per query
+
+        Returns:
+            List of (top_doc_ids, metadata) tuples, in the order of queries
+        """
+        query_embeddings = self.embedding_service.embed_texts([query_text for query_text, _ in queries])
+
+        doc_matrix = self.embedding_service.get_doc_matrix()
+
+        if not doc_matrix.doc_ids:
+            logger.warning("No documents found in database")
+            return [([], {}) for _ in queries]
 
-        top_indices = np.argsort(similarities)[::-1][:top_k]
-        top_doc_ids = [doc_ids[i] for i in top_indices]
-        top_scores = [float(similarities[i]) for i in top_indices]
+        results = self.embedding_service.top_k_batch(query_embeddings, top_k, doc_matrix)
+        return [self._search_result(doc_matrix, top_indices, top_scores) for top_indices, top_scores in results]
+
+    @staticmethod
+    def _search_result(
+        doc_matrix: DocMatrix, top_indices: np.ndarray, top_scores: np.ndarray
+    ) -> Tuple[List[str], Dict[str, float]]:
+        """Map top-k row indices and scores onto doc ids and the metadata returned by search()."""
+        top_doc_ids = [doc_matrix.doc_ids[i] for i in top_indices]
 
         metadata = {
-            "scores": dict(zip(top_doc_ids, top_scores)),
-            "total_documents": len(doc_ids),
+            "scores": dict(zip(top_doc_ids, top_scores.tolist())),
+            "total_documents": len(doc_matrix.doc_ids),
         }
 
         return top_doc_ids, metadata
@@ -67,7 +93,7 @@ class SearchService:
             logger.warning("No query_id provided for P@K calculation")
             return 0.0
 
-        relevant_docs = set(QueryRelevance.objects.filter(query_id=query_id).values_list("doc_id", flat=True))
+        relevant_docs = self.get_qrels().get(query_id, frozenset())
 
         if not relevant_docs:
             logger.warning(f"No relevant documents found for query_id: {query_id}")
@@ -83,6 +109,19 @@ class SearchService:
         top_docs, metadata = self.search(query_text, query_id, top_k)
         p5 = self.calculate_precision_at_k(query_id, top_docs, k=5)
 
+        return self._evaluation(top_docs, metadata, p5)
+
+    def search_and_evaluate_batch(self, queries: List[Tuple[str, str]], top_k: int = 10) -> List[Dict]:
+        """Perform search_batch() and calculate evaluation metrics for each query."""
+        results = self.search_batch(queries, top_k)
+
+        return [
+            self._evaluation(top_docs, metadata, self.calculate_precision_at_k(query_id, top_docs, k=5))
+            for (_, query_id), (top_docs, metadata) in zip(queries, results)
+        ]
+
+    @staticmethod
+    def _evaluation(top_docs: List[str], metadata: Dict, p5: float) -> Dict:
         return {
             "top_docs": top_docs,
             "p5": round(p5, 3),
@@ -92,9 +131,43 @@ class SearchService:
 
     def get_relevant_docs(self, query_id: str) -> List[str]:
         """Get all relevant documents for a query from qrels."""
-        return list(QueryRelevance.objects.filter(query_id=query_id).values_list("doc_id", flat=True))
+        return sorted(self.get_qrels().get(query_id, ()))
 
-    def get_cache_statistics(self) -> Dict:
+    @classmethod
+    def get_qrels(cls) -> Dict[str, FrozenSet[str]]:
+        """
+        Return relevance judgments grouped by query_id, loading them on first use.
+
+        The qrels table is small and only changes when the dataset is indexed,
+        so evaluation reads it once instead of querying per request. A
+        classmethod, so /status/ can use it without loading the model.
+
+        Signals only see ORM writes made in this process. The indexer usually
+        runs in another process and saves the doc matrix after the qrels, so
+        the qrels are also reloaded when the saved matrix stamp changes.
+        """
+        stamp = EmbeddingService.saved_doc_matrix_stamp()
+        qrels = cls._qrels
+        if qrels is not None and stamp == cls._qrels_stamp:
+            return qrels
+
+        with cls._qrels_lock:
+            if cls._qrels is None or stamp != cls._qrels_stamp:
+                grouped = defaultdict(set)
+                for query_id, doc_id in QueryRelevance.objects.values_list("query_id", "doc_id").iterator():
+                    grouped[query_id].add(doc_id)
+                cls._qrels = {query_id: frozenset(doc_ids) for query_id, doc_ids in grouped.items()}
+                cls._qrels_stamp = stamp
+                logger.info(f"Loaded relevance judgments for {len(grouped)} queries")
+            return cls._qrels
+
+    @classmethod
+    def invalidate_qrels(cls):
+        """Drop the cached qrels so the next evaluation reloads them."""
+        with cls._qrels_lock:
+            cls._qrels = None
+
+    def get_cache_statistics(self) -> CacheStats:
         """Get embedding cache statistics."""
         return self.embedding_service.get_cache_info()
 
@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 
 
@@ -57,6 +58,39 @@ class QueryResponseSerializer(serializers.Serializer):
     p5 = serializers.FloatField(help_text="Precision@5 metric for the query")
 
 
+class QueryBatchRequestSerializer(serializers.Serializer):
+    """
+    Serializer for the /query_batch/ endpoint request.
+
+    Validates a list of queries, each in the /query/ request format.
+    """
+
+    queries = QueryRequestSerializer(
+        many=True,
+        allow_empty=False,
+        max_length=settings.QUERY_BATCH_MAX_SIZE,
+        help_text="Queries to search, each with a query_id and query_text",
+    )
+
+
+class QueryBatchResultSerializer(QueryResponseSerializer):
+    """
+    Serializer for one query's results in the /query_batch/ endpoint response.
+    """
+
+    query_id = serializers.CharField(help_text="Identifier of the query these results belong to")
+
+
+class QueryBatchResponseSerializer(serializers.Serializer):
+    """
+    Serializer for the /query_batch/ endpoint response.
+
+    Returns search results and evaluation metrics per query, in request order.
+    """
+
+    results = QueryBatchResultSerializer(many=True, help_text="Results for each query, in request order")
+
+
 class ErrorResponseSerializer(serializers.Serializer):
     """
     Serializer for error responses.
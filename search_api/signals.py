@@ -0,0 +1,23 @@
+"""
+Signal handlers keeping in-memory search state in sync with the database.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .embedding_service import EmbeddingService
+from .models import Document, QueryRelevance
+from .search_service import SearchService
+
+
+@receiver([post_save, post_delete], sender=Document)
+def invalidate_doc_matrix(sender, **kwargs):
+    """Documents changed through the ORM, drop the saved matrix and reload on the next search."""
+    EmbeddingService.discard_saved_doc_matrix()
+    EmbeddingService.invalidate_doc_matrix()
+
+
+@receiver([post_save, post_delete], sender=QueryRelevance)
+def invalidate_qrels(sender, **kwargs):
+    """Relevance judgments changed through the ORM, reload them on the next evaluation."""
+    SearchService.invalidate_qrels()
@@ -8,15 +8,42 @@ Tests cover:
 - Model operations
 """
 
+import importlib.util
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
 import numpy as np
-from django.test import TestCase, TransactionTestCase
+from django.conf import settings
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from search_api.embedding_service import EmbeddingService
+import search_api.embedding_service
+from search_api import ann
+from search_api.cache import CacheStats, LRUCache, ShardedLRUCache
+from search_api.embedding_service import DocMatrix, EmbeddingService
 from search_api.models import Document, Query, QueryRelevance
 from search_api.search_service import SearchService
+from search_api.serializers import QueryBatchResponseSerializer, QueryResponseSerializer
+from search_api.views import QueryView
+
+
+def setUpModule():
+    # Document signals remove the saved matrix's manifest, keep them away from the real one
+    global _doc_matrix_dir, _doc_matrix_settings
+    _doc_matrix_dir = tempfile.TemporaryDirectory()
+    _doc_matrix_settings = override_settings(DOC_MATRIX_PATH=f"{_doc_matrix_dir.name}/doc_matrix")
+    _doc_matrix_settings.enable()
+
+
+def tearDownModule():
+    _doc_matrix_settings.disable()
+    _doc_matrix_dir.cleanup()
 
 
 class EmbeddingServiceTests(TestCase):
@@ -53,6 +80,16 @@ class EmbeddingServiceTests(TestCase):
 
         self.assertIsInstance(embeddings, np.ndarray)
         self.assertEqual(embeddings.shape[0], len(texts))
+        np.testing.assert_array_almost_equal(np.linalg.norm(embeddings, axis=1), np.ones(len(texts)), decimal=5)
+
+    def test_embed_batch_matches_model_encode(self):
+        """Test that the direct forward pass matches SentenceTransformer.encode."""
+        texts = ["heart disease", "diabetes management and treatment", "cancer " * 400]
+        embeddings = self.service.embed_batch(texts, batch_size=2)
+
+        expected = self.service._model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+
+        np.testing.assert_allclose(embeddings, expected, atol=1e-5)
 
     def test_embed_batch_filters_empty_texts(self):
         """Test that batch embedding filters out empty texts."""
@@ -62,6 +99,16 @@ class EmbeddingServiceTests(TestCase):
         # Should only embed 3 valid texts
         self.assertEqual(embeddings.shape[0], 3)
 
+    def test_embed_batch_truncates_long_texts(self):
+        """Test that texts over max_length tokens are truncated and reported."""
+        texts = ["heart disease " * 400, "diabetes"]
+
+        with self.assertLogs("search_api.embedding_service", level="WARNING") as logs:
+            embeddings = self.service.embed_batch(texts, max_length=64)
+
+        self.assertEqual(embeddings.shape[0], 2)
+        self.assertIn("Truncated 1 texts exceeding 64 tokens", logs.output[0])
+
     def test_embed_batch_all_empty_raises_error(self):
         """Test that batch embedding all empty texts raises ValueError."""
         texts = ["", "   ", ""]
@@ -74,33 +121,186 @@ class EmbeddingServiceTests(TestCase):
         serialized = EmbeddingService.serialize_embedding(original)
         deserialized = EmbeddingService.deserialize_embedding(serialized)
 
-        np.testing.assert_array_almost_equal(original, deserialized)
+        self.assertIsInstance(serialized, bytes)
+        self.assertEqual(len(serialized), original.shape[0] * 2)  # float16
+        np.testing.assert_array_almost_equal(original, deserialized, decimal=3)
+
+    def test_normalize_embeddings(self):
+        """Test that normalization yields unit vectors for single and batched input."""
+        single = EmbeddingService.normalize_embeddings(np.array([3.0, 4.0]))
+        batch = EmbeddingService.normalize_embeddings(np.array([[3.0, 4.0], [0.0, 2.0]]))
+
+        np.testing.assert_array_almost_equal(single, [0.6, 0.8])
+        np.testing.assert_array_almost_equal(np.linalg.norm(batch, axis=1), [1.0, 1.0])
+        np.testing.assert_array_equal(EmbeddingService.normalize_embeddings(np.zeros(4)), np.zeros(4))
+
+    def test_compute_cosine_similarity(self):
+        """Test that scoring against unit-normalized docs gives cosine similarity."""
+        docs = EmbeddingService.normalize_embeddings(np.array([[1.0, 0.0], [1.0, 1.0], [0.0, 1.0]]))
+        scores = self.service.compute_cosine_similarity(np.array([2.0, 0.0]), docs)
+
+        np.testing.assert_array_almost_equal(scores, [1.0, np.sqrt(0.5), 0.0], decimal=5)
+
+    def test_serialize_deserialize_embedding_int8(self):
+        """Test int8 quantization round trip."""
+        original = EmbeddingService.normalize_embeddings(np.array([0.1, -0.2, 0.3, 0.4]))
+        serialized = EmbeddingService.serialize_embedding_int8(original)
+        codes, scale = EmbeddingService.deserialize_embedding_int8(serialized)
+
+        self.assertEqual(len(serialized), 2 + original.shape[0])  # float16 scale + int8 codes
+        self.assertEqual(codes.dtype, np.int8)
+        self.assertEqual(np.abs(codes).max(), 127)
+        np.testing.assert_allclose(codes * scale, original, atol=1 / 127)
+
+    def test_compute_int8_similarity(self):
+        """Test that int8 scores approximate float cosine similarity."""
+        rng = np.random.default_rng(0)
+        docs = EmbeddingService.normalize_embeddings(rng.standard_normal((20, 384)))
+        query = rng.standard_normal(384)
+        codes, scales = EmbeddingService.quantize_embeddings(docs)
+
+        exact = self.service.compute_cosine_similarity(query, docs)
+        approx = self.service.compute_int8_similarity(query, codes, scales)
+
+        np.testing.assert_allclose(approx, exact, atol=0.02)
+
+    def test_compute_int8_similarity_without_simsimd(self):
+        """Test that the fallback kernels match the simsimd int8 scores."""
+        rng = np.random.default_rng(0)
+        docs = EmbeddingService.normalize_embeddings(rng.standard_normal((20, 384)))
+        query = rng.standard_normal(384)
+        codes, scales = EmbeddingService.quantize_embeddings(docs)
+
+        expected = self.service.compute_int8_similarity(query, codes, scales)
+
+        with mock.patch("search_api.embedding_service.simsimd", None):
+            numba_scores = self.service.compute_int8_similarity(query, codes, scales)
+            with mock.patch("search_api.embedding_service.int8_dot_scores", None):
+                numpy_scores = self.service.compute_int8_similarity(query, codes, scales)
+
+        np.testing.assert_allclose(numba_scores, expected, rtol=1e-5, atol=1e-6)
+        np.testing.assert_allclose(numpy_scores, expected, rtol=1e-5, atol=1e-6)
+
+    def test_top_k(self):
+        """Test that top_k matches a full sort, including k beyond the corpus size."""
+        rng = np.random.default_rng(0)
+        docs = EmbeddingService.normalize_embeddings(rng.standard_normal((50, 384))).astype(np.float32)
+        query = rng.standard_normal(384)
+        doc_matrix = DocMatrix([f"D{i}" for i in range(50)], docs)
+
+        scores = self.service.compute_cosine_similarity(query, docs)
+        expected = np.argsort(-scores)
+
+        indices, top_scores = self.service.top_k(query, 5, doc_matrix)
+        np.testing.assert_array_equal(indices, expected[:5])
+        # the fused numba kernel sums in a different order than BLAS
+        np.testing.assert_allclose(top_scores, scores[expected[:5]], rtol=1e-5)
+
+        with mock.patch("search_api.embedding_service.float_top_k", None):
+            indices, top_scores = self.service.top_k(query, 5, doc_matrix)
+        np.testing.assert_array_equal(indices, expected[:5])
+        np.testing.assert_allclose(top_scores, scores[expected[:5]])
+
+        indices, _ = self.service.top_k(query, 100, doc_matrix)
+        np.testing.assert_array_equal(indices, expected)
+
+        queries = [query, rng.standard_normal(384)]
+        for (indices, top_scores), single in zip(self.service.top_k_batch(queries, 5, doc_matrix), queries):
+            expected_indices, expected_scores = self.service.top_k(single, 5, doc_matrix)
+            np.testing.assert_array_equal(indices, expected_indices)
+            np.testing.assert_allclose(top_scores, expected_scores, rtol=1e-5)
+
+        # saved matrices come back as read-only memmaps
+        docs.flags.writeable = False
+        indices, _ = self.service.top_k(query, 5, doc_matrix)
+        np.testing.assert_array_equal(indices, expected[:5])
+
+    def test_top_k_concurrent_calls(self):
+        """Test that request threads can run the top-k kernel at the same time."""
+        rng = np.random.default_rng(1)
+        docs = EmbeddingService.normalize_embeddings(rng.standard_normal((5000, 384))).astype(np.float32)
+        doc_matrix = DocMatrix([f"D{i}" for i in range(5000)], docs)
+        query = rng.standard_normal(384)
+        expected, _ = self.service.top_k(query, 10, doc_matrix)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: self.service.top_k(query, 10, doc_matrix)[0], range(32)))
+
+        for indices in results:
+            np.testing.assert_array_equal(indices, expected)
+
+    def test_kernels_import_does_not_start_thread_pool(self):
+        """Test that importing the kernels leaves numba's thread pool to the first call, after any fork."""
+        if importlib.util.find_spec("numba") is None:
+            self.skipTest("numba is not installed")
+
+        script = "import numba, search_api.kernels\ntry:\n    numba.threading_layer()\nexcept ValueError:\n    print('idle')"
+        result = subprocess.run([sys.executable, "-c", script], cwd=settings.BASE_DIR, capture_output=True, text=True)
+
+        self.assertEqual(result.stdout.strip(), "idle", result.stderr)
+
+    def test_warm_kernels_falls_back_without_threadsafe_layer(self):
+        """Test that the kernels are disabled when no thread-safe threading layer is available."""
+        with (
+            mock.patch("search_api.embedding_service.warm_up_kernels", side_effect=ValueError("No threading layer")),
+            mock.patch("search_api.embedding_service.float_top_k", mock.sentinel.kernel),
+            mock.patch("search_api.embedding_service.int8_dot_scores", mock.sentinel.kernel),
+            self.assertLogs("search_api.embedding_service", level="WARNING"),
+        ):
+            EmbeddingService._warm_kernels()
+
+            self.assertIsNone(search_api.embedding_service.float_top_k)
+            self.assertIsNone(search_api.embedding_service.int8_dot_scores)
+
+    def test_get_doc_matrix_loads_once_under_concurrency(self):
+        """Test that concurrent first calls share a single matrix load."""
+        doc_matrix = DocMatrix(["D1"], np.ones((1, 384), dtype=np.float32) / np.sqrt(384))
+        loads = []
+
+        def slow_load():
+            loads.append(1)
+            time.sleep(0.05)
+            EmbeddingService._doc_matrix = doc_matrix
+            return doc_matrix
+
+        EmbeddingService.invalidate_doc_matrix()
+        with (
+            mock.patch.object(self.service, "_load_saved_doc_matrix", return_value=None),
+            mock.patch.object(self.service, "load_doc_matrix", side_effect=slow_load),
+        ):
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                results = list(pool.map(lambda _: self.service.get_doc_matrix(), range(4)))
+
+        self.assertEqual(len(loads), 1)
+        self.assertTrue(all(result is doc_matrix for result in results))
+        EmbeddingService.invalidate_doc_matrix()
 
     def test_embed_query_caching(self):
         """Test that embed_query caches by query_id."""
         # First call - cache miss
         emb1 = self.service.embed_query("heart disease", "Q1")
         stats1 = self.service.get_cache_info()
-        self.assertEqual(stats1["misses"], 1)
-        self.assertEqual(stats1["hits"], 0)
+        self.assertEqual(stats1.misses, 1)
+        self.assertEqual(stats1.hits, 0)
 
         # Second call with same query_id and text - cache hit
         emb2 = self.service.embed_query("heart disease", "Q1")
         stats2 = self.service.get_cache_info()
-        self.assertEqual(stats2["hits"], 1)
+        self.assertEqual(stats2.hits, 1)
 
         # Embeddings should be identical
         np.testing.assert_array_equal(emb1, emb2)
 
     def test_embed_query_different_query_ids(self):
-        """Test that different query_ids create separate cache entries."""
+        """Test that the same text under different query_ids shares one cache entry."""
         # Same text, different query_ids
         emb1 = self.service.embed_query("heart disease", "Q1")
         emb2 = self.service.embed_query("heart disease", "Q2")
 
         stats = self.service.get_cache_info()
-        self.assertEqual(stats["misses"], 2)  # Both were misses
-        self.assertEqual(stats["size"], 2)  # Two cache entries
+        self.assertEqual(stats.misses, 1)  # Only the first call embedded
+        self.assertEqual(stats.hits, 1)
+        self.assertEqual(stats.size, 1)  # One cache entry
 
         # Embeddings should be identical (same text)
         np.testing.assert_array_equal(emb1, emb2)
@@ -110,15 +310,41 @@ class EmbeddingServiceTests(TestCase):
         # First call - cache miss
         emb1 = self.service.embed_text("diabetes")
         stats1 = self.service.get_cache_info()
-        self.assertEqual(stats1["misses"], 1)
+        self.assertEqual(stats1.misses, 1)
 
         # Second call with same text - cache hit
         emb2 = self.service.embed_text("diabetes")
         stats2 = self.service.get_cache_info()
-        self.assertEqual(stats2["hits"], 1)
+        self.assertEqual(stats2.hits, 1)
 
         np.testing.assert_array_equal(emb1, emb2)
 
+    def test_embed_text_cache_ignores_whitespace_and_case(self):
+        """Test that texts the uncased tokenizer can't tell apart share a cache entry."""
+        emb1 = self.service.embed_text("Heart  Disease ")
+        emb2 = self.service.embed_text("heart disease")
+
+        self.assertIs(emb1, emb2)
+        self.assertEqual(self.service.get_cache_info().size, 1)
+
+    def test_embed_texts_matches_embed_text(self):
+        """Test that batched query embeddings match and share the single-text cache."""
+        cached = self.service.embed_text("cancer")
+
+        embeddings = self.service.embed_texts(["cancer", "heart disease", "Heart  disease"])
+
+        self.assertIs(embeddings[0], cached)
+        self.assertIs(embeddings[1], embeddings[2])
+        np.testing.assert_allclose(embeddings[1], self.service.embed_text("heart disease"), atol=1e-5)
+
+    def test_cache_hit_returns_shared_read_only_array(self):
+        """Test that cache hits return the cached array itself, protected from mutation."""
+        emb1 = self.service.embed_text("cancer")
+        emb2 = self.service.embed_text("cancer")
+
+        self.assertIs(emb1, emb2)
+        self.assertFalse(emb1.flags.writeable)
+
     def test_cache_statistics(self):
         """Test cache statistics tracking."""
         self.service.clear_cache()
@@ -129,11 +355,11 @@ class EmbeddingServiceTests(TestCase):
         self.service.embed_query("diabetes", "Q2")  # Miss
 
         stats = self.service.get_cache_info()
-        self.assertEqual(stats["hits"], 1)
-        self.assertEqual(stats["misses"], 2)
-        self.assertEqual(stats["size"], 2)
-        self.assertEqual(stats["maxsize"], 1000)
-        self.assertAlmostEqual(stats["hit_rate"], 1 / 3, places=2)
+        self.assertEqual(stats.hits, 1)
+        self.assertEqual(stats.misses, 2)
+        self.assertEqual(stats.size, 2)
+        self.assertEqual(stats.maxsize, settings.EMBEDDING_CACHE_SIZE)
+        self.assertAlmostEqual(stats.hit_rate, 1 / 3, places=2)
 
     def test_clear_cache(self):
         """Test clearing the cache."""
@@ -142,15 +368,48 @@ class EmbeddingServiceTests(TestCase):
         self.service.embed_query("diabetes", "Q2")
 
         stats_before = self.service.get_cache_info()
-        self.assertEqual(stats_before["size"], 2)
+        self.assertEqual(stats_before.size, 2)
 
         # Clear cache
         self.service.clear_cache()
 
         stats_after = self.service.get_cache_info()
-        self.assertEqual(stats_after["size"], 0)
-        self.assertEqual(stats_after["hits"], 0)
-        self.assertEqual(stats_after["misses"], 0)
+        self.assertEqual(stats_after.size, 0)
+        self.assertEqual(stats_after.hits, 0)
+        self.assertEqual(stats_after.misses, 0)
+
+
+class CacheTests(TestCase):
+    """Tests for the in-process LRU caches."""
+
+    def test_lru_evicts_least_recently_used(self):
+        """Test that the oldest untouched entry is evicted first."""
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(len(cache), 2)
+
+    def test_sharded_cache_aggregates_statistics(self):
+        """Test that shard statistics add up and clear resets them."""
+        cache = ShardedLRUCache(maxsize=64, num_shards=4)
+        for i in range(10):
+            cache.put(f"key-{i}", i)
+        for i in range(5):
+            cache.get(f"key-{i}")
+        cache.get("missing")
+
+        self.assertEqual(len(cache), 10)
+        self.assertEqual(cache.hits, 5)
+        self.assertEqual(cache.misses, 1)
+
+        cache.clear()
+        self.assertEqual((len(cache), cache.hits, cache.misses), (0, 0, 0))
 
 
 class ModelTests(TransactionTestCase):
@@ -199,10 +458,14 @@ class SearchServiceTests(TransactionTestCase):
         ]
 
         for i, text in enumerate(texts):
-            embedding = self.embedding_service.embed_text(text)
-            embedding_str = self.embedding_service.serialize_embedding(embedding)
+            embedding = self.embedding_service.normalize_embeddings(self.embedding_service.embed_text(text))
 
-            Document.objects.create(doc_id=f"MED-{i+1}", text=text, embedding=embedding_str)
+            Document.objects.create(
+                doc_id=f"MED-{i+1}",
+                text=text,
+                embedding=self.embedding_service.serialize_embedding(embedding),
+                embedding_int8=self.embedding_service.serialize_embedding_int8(embedding),
+            )
 
     def test_search_returns_results(self):
         """Test that search returns results."""
@@ -225,7 +488,7 @@ class SearchServiceTests(TransactionTestCase):
 
         # Check cache was used
         cache_stats = self.embedding_service.get_cache_info()
-        self.assertGreater(cache_stats["hits"], 0)
+        self.assertGreater(cache_stats.hits, 0)
 
     def test_search_ranking(self):
         """Test that search returns documents in order of similarity."""
@@ -235,6 +498,175 @@ class SearchServiceTests(TransactionTestCase):
         scores = metadata["scores"]
         self.assertGreater(scores[top_docs[0]], scores[top_docs[1]])
 
+    def test_search_int8_scoring(self):
+        """Test that int8 scoring ranks documents like the float path."""
+        top_docs, metadata = self.service.search(query_text="cardiovascular", top_k=3)
+
+        with override_settings(EMBEDDING_INT8_SCORING=True):
+            top_docs_int8, metadata_int8 = self.service.search(query_text="cardiovascular", top_k=3)
+
+        self.assertEqual(top_docs_int8[0], top_docs[0])
+        for doc_id in top_docs:
+            self.assertAlmostEqual(metadata_int8["scores"][doc_id], metadata["scores"][doc_id], places=1)
+
+    @override_settings(EMBEDDING_INT8_SCORING=True)
+    def test_load_doc_matrix_int8_quantizes_missing_codes(self):
+        """Test that int8 loading falls back to the float16 embedding when embedding_int8 is empty."""
+        embedding = self.embedding_service.normalize_embeddings(self.embedding_service.embed_text("heart disease"))
+        Document.objects.create(
+            doc_id="MED-4", text="heart disease", embedding=self.embedding_service.serialize_embedding(embedding)
+        )
+
+        with self.assertLogs("search_api.embedding_service", level="WARNING"):
+            doc_matrix = self.embedding_service.load_doc_matrix()
+
+        row = doc_matrix.doc_ids.index("MED-4")
+        dequantized = doc_matrix.matrix[row].astype(np.float32) * doc_matrix.scales[row]
+        np.testing.assert_allclose(dequantized, embedding, atol=1e-2)
+
+        top_docs, _ = self.service.search(query_text="heart disease", top_k=1)
+        self.assertEqual(top_docs, ["MED-4"])
+        EmbeddingService.invalidate_doc_matrix()
+
+    def test_search_sees_new_documents(self):
+        """Test that saving a document invalidates the loaded document matrix."""
+        self.service.search(query_text="heart disease", top_k=3)
+
+        embedding = self.embedding_service.normalize_embeddings(self.embedding_service.embed_text("heart disease"))
+        Document.objects.create(
+            doc_id="MED-4",
+            text="heart disease",
+            embedding=self.embedding_service.serialize_embedding(embedding),
+            embedding_int8=self.embedding_service.serialize_embedding_int8(embedding),
+        )
+
+        top_docs, metadata = self.service.search(query_text="heart disease", top_k=4)
+
+        self.assertEqual(top_docs[0], "MED-4")
+        self.assertEqual(metadata["total_documents"], 4)
+
+    @override_settings(DEBUG=True)
+    def test_search_normalizes_legacy_documents(self):
+        """Test that embeddings stored without unit normalization are normalized on load."""
+        Document.objects.create(
+            doc_id="MED-4",
+            text="unnormalized",
+            embedding=self.embedding_service.serialize_embedding(np.full(384, 0.5, dtype=np.float32)),
+        )
+
+        # the debug unit-norm check must not trip on the repaired matrix
+        with self.assertLogs("search_api.embedding_service", level="WARNING"):
+            _, metadata = self.service.search(query_text="heart disease", top_k=4)
+
+        self.assertTrue(all(-1.0 <= score <= 1.0 + 1e-3 for score in metadata["scores"].values()))
+
+    @override_settings(DEBUG=True)
+    def test_get_doc_matrix_rejects_unnormalized_saved_matrix_in_debug(self):
+        """Test that a matrix failing the debug unit-norm check is not kept for later requests."""
+        bad = DocMatrix(["MED-1"], np.full((1, 384), 0.5, dtype=np.float32))
+
+        def load_saved():
+            EmbeddingService._doc_matrix = bad
+            return bad
+
+        EmbeddingService.invalidate_doc_matrix()
+        with mock.patch.object(self.embedding_service, "_load_saved_doc_matrix", side_effect=load_saved):
+            with self.assertRaises(AssertionError):
+                self.embedding_service.get_doc_matrix()
+
+        self.assertIsNone(EmbeddingService._doc_matrix)
+
+    def test_load_doc_matrix_grows_past_stale_count(self):
+        """Test that rows inserted after count() still end up in the matrix."""
+        expected = self.embedding_service.load_doc_matrix()
+
+        with mock.patch.object(Document.objects, "count", return_value=1):
+            doc_matrix = self.embedding_service.load_doc_matrix()
+
+        self.assertEqual(doc_matrix.doc_ids, expected.doc_ids)
+        np.testing.assert_array_equal(doc_matrix.matrix, expected.matrix)
+        EmbeddingService.invalidate_doc_matrix()
+
+    def test_saved_doc_matrix_is_memory_mapped(self):
+        """Test that a saved document matrix is loaded back as a memory map."""
+        with tempfile.TemporaryDirectory() as tmp, override_settings(DOC_MATRIX_PATH=f"{tmp}/doc_matrix"):
+            doc_matrix = self.embedding_service.load_doc_matrix()
+            self.embedding_service.save_doc_matrix(doc_matrix)
+            EmbeddingService.invalidate_doc_matrix()
+
+            loaded = self.embedding_service.get_doc_matrix()
+
+            self.assertIsInstance(loaded.matrix, np.memmap)
+            # built and memory-mapped matrices both start on a cache line
+            self.assertEqual(doc_matrix.matrix.ctypes.data % 64, 0)
+            self.assertEqual(loaded.matrix.ctypes.data % 64, 0)
+            self.assertEqual(loaded.doc_ids, doc_matrix.doc_ids)
+            np.testing.assert_array_equal(loaded.matrix, doc_matrix.matrix)
+
+            # A document added after saving makes the saved matrix stale
+            embedding = self.embedding_service.normalize_embeddings(self.embedding_service.embed_text("new"))
+            Document.objects.create(
+                doc_id="MED-0", text="new", embedding=self.embedding_service.serialize_embedding(embedding)
+            )
+            reloaded = self.embedding_service.get_doc_matrix()
+
+            self.assertNotIsInstance(reloaded.matrix, np.memmap)
+            self.assertEqual(reloaded.doc_ids, ["MED-0"] + doc_matrix.doc_ids)
+
+            EmbeddingService.invalidate_doc_matrix()
+
+    def test_saved_doc_matrix_discarded_when_a_document_changes(self):
+        """Test that updating a document's embedding keeps the old saved matrix from being mapped again."""
+        self.embedding_service.save_doc_matrix(self.embedding_service.load_doc_matrix())
+        EmbeddingService.invalidate_doc_matrix()
+        self.assertIsInstance(self.embedding_service.get_doc_matrix().matrix, np.memmap)
+
+        embedding = self.embedding_service.normalize_embeddings(self.embedding_service.embed_text("heart disease"))
+        document = Document.objects.get(doc_id="MED-2")
+        document.embedding = self.embedding_service.serialize_embedding(embedding)
+        document.save()
+
+        doc_matrix = self.embedding_service.get_doc_matrix()
+
+        self.assertNotIsInstance(doc_matrix.matrix, np.memmap)
+        np.testing.assert_allclose(doc_matrix.matrix[doc_matrix.doc_ids.index("MED-2")], embedding, atol=1e-3)
+        EmbeddingService.invalidate_doc_matrix()
+
+    def test_search_with_ann_index(self):
+        """Test that each installed HNSW backend returns the exact top-k on a small corpus."""
+        exact_docs, exact_metadata = self.service.search(query_text="cardiovascular", top_k=2)
+
+        for backend in ("faiss", "hnswlib"):
+            if getattr(ann, backend) is None:
+                continue
+            with (
+                self.subTest(backend=backend),
+                tempfile.TemporaryDirectory() as tmp,
+                override_settings(DOC_MATRIX_PATH=f"{tmp}/doc_matrix", ANN_BACKEND=backend, ANN_MIN_DOCUMENTS=0),
+            ):
+                self.embedding_service.save_doc_matrix(self.embedding_service.load_doc_matrix())
+                EmbeddingService.invalidate_doc_matrix()
+
+                top_docs, metadata = self.service.search(query_text="cardiovascular", top_k=2)
+
+                self.assertIsNotNone(self.embedding_service.get_doc_matrix().ann_index)
+                EmbeddingService.invalidate_doc_matrix()
+
+                self.assertEqual(top_docs, exact_docs)
+                for doc_id in top_docs:
+                    self.assertAlmostEqual(metadata["scores"][doc_id], exact_metadata["scores"][doc_id], places=5)
+
+            # small corpora keep the exact scan
+            with (
+                tempfile.TemporaryDirectory() as tmp,
+                override_settings(DOC_MATRIX_PATH=f"{tmp}/doc_matrix", ANN_BACKEND=backend),
+            ):
+                self.embedding_service.save_doc_matrix(self.embedding_service.load_doc_matrix())
+                EmbeddingService.invalidate_doc_matrix()
+
+                self.assertIsNone(self.embedding_service.get_doc_matrix().ann_index)
+                EmbeddingService.invalidate_doc_matrix()
+
     def test_calculate_precision_at_k(self):
         """Test P@K calculation."""
         # Create qrels
@@ -248,6 +680,18 @@ class SearchServiceTests(TransactionTestCase):
         # 2 relevant out of 5 = 0.4
         self.assertAlmostEqual(p5, 0.4, places=2)
 
+        # qrels are cached in memory, new judgments must still be seen
+        QueryRelevance.objects.create(query_id="TEST-1", doc_id="MED-3", relevance_score=1)
+        p5 = self.service.calculate_precision_at_k("TEST-1", retrieved, k=5)
+        self.assertAlmostEqual(p5, 0.6, places=2)
+
+        # bulk writes send no signals; the indexer, often in another process, saves the doc matrix after them
+        QueryRelevance.objects.bulk_create([QueryRelevance(query_id="TEST-1", doc_id="MED-4", relevance_score=1)])
+        self.embedding_service.save_doc_matrix(self.embedding_service.load_doc_matrix())
+        p5 = self.service.calculate_precision_at_k("TEST-1", retrieved, k=5)
+        self.assertAlmostEqual(p5, 0.8, places=2)
+        EmbeddingService.invalidate_doc_matrix()
+
     def test_precision_at_k_no_relevant(self):
         """Test P@K when there are no relevant documents."""
         retrieved = ["MED-1", "MED-2", "MED-3"]
@@ -275,9 +719,9 @@ class SearchServiceTests(TransactionTestCase):
         self.service.search("heart disease", query_id="Q1", top_k=5)
 
         stats = self.service.get_cache_statistics()
-        self.assertIn("hits", stats)
-        self.assertIn("misses", stats)
-        self.assertGreater(stats["hits"], 0)
+        self.assertIsInstance(stats, CacheStats)
+        self.assertIn("misses", stats._asdict())
+        self.assertGreater(stats.hits, 0)
 
     def test_clear_embedding_cache(self):
         """Test clearing cache via SearchService."""
@@ -285,13 +729,13 @@ class SearchServiceTests(TransactionTestCase):
         self.service.search("diabetes", query_id="Q1", top_k=5)
 
         stats_before = self.service.get_cache_statistics()
-        self.assertGreater(stats_before["size"], 0)
+        self.assertGreater(stats_before.size, 0)
 
         # Clear cache
         self.service.clear_embedding_cache()
 
         stats_after = self.service.get_cache_statistics()
-        self.assertEqual(stats_after["size"], 0)
+        self.assertEqual(stats_after.size, 0)
 
 
 class StatusAPITests(APITestCase):
@@ -305,7 +749,7 @@ class StatusAPITests(APITestCase):
         # Create test documents
         for i in range(5):
             embedding = embedding_service.embed_text(f"test doc {i}")
-            embedding_str = embedding_service.serialize_embedding(embedding)
+            embedding_str = embedding_service.serialize_embedding(embedding_service.normalize_embeddings(embedding))
 
             Document.objects.create(doc_id=f"MED-{i+1}", text=f"test document {i}", embedding=embedding_str)
 
@@ -324,6 +768,34 @@ class StatusAPITests(APITestCase):
         self.assertEqual(response.data["num_of_indexed_items"], 5)
         self.assertEqual(response.data["num_of_queries_in_qrels"], 3)
 
+        # the count comes from the cached qrels, which must pick up new judgments
+        QueryRelevance.objects.create(query_id="PLAIN-9", doc_id="MED-1", relevance_score=1)
+        response = self.client.post(url, {}, format="json")
+        self.assertEqual(response.data["num_of_queries_in_qrels"], 4)
+
+        # also when written without signals, as the indexer does from its own process before saving the doc matrix
+        QueryRelevance.objects.bulk_create([QueryRelevance(query_id="PLAIN-10", doc_id="MED-1", relevance_score=1)])
+        embedding_service = EmbeddingService()
+        embedding_service.save_doc_matrix(embedding_service.load_doc_matrix())
+        response = self.client.post(url, {}, format="json")
+        self.assertEqual(response.data["num_of_queries_in_qrels"], 5)
+
+        # and when a reindex leaves the row count unchanged
+        QueryRelevance.objects.filter(query_id="PLAIN-10").update(query_id="PLAIN-1", doc_id="MED-5")
+        embedding_service.save_doc_matrix(embedding_service.load_doc_matrix())
+        response = self.client.post(url, {}, format="json")
+        self.assertEqual(response.data["num_of_queries_in_qrels"], 4)
+        EmbeddingService.invalidate_doc_matrix()
+
+    def test_status_endpoint_drops_stale_doc_matrix(self):
+        """Test that a document count mismatch makes the next search reload the matrix."""
+        url = reverse("search_api:status")
+        EmbeddingService._doc_matrix = DocMatrix(["MED-1"], np.ones((1, 384), dtype=np.float32) / np.sqrt(384))
+
+        self.client.post(url, {}, format="json")
+
+        self.assertIsNone(EmbeddingService._doc_matrix)
+
 
 class QueryAPITests(APITestCase):
     """Tests for the /query/ endpoint."""
@@ -338,7 +810,7 @@ class QueryAPITests(APITestCase):
 
         for i, text in enumerate(texts):
             embedding = embedding_service.embed_text(text)
-            embedding_str = embedding_service.serialize_embedding(embedding)
+            embedding_str = embedding_service.serialize_embedding(embedding_service.normalize_embeddings(embedding))
 
             Document.objects.create(doc_id=f"MED-{i+1}", text=text, embedding=embedding_str)
 
@@ -356,6 +828,74 @@ class QueryAPITests(APITestCase):
         self.assertIn("top_docs", response.data)
         self.assertIn("p5", response.data)
         self.assertEqual(len(response.data["top_docs"]), 3)
+        # the view skips output validation, so check the response schema here
+        self.assertTrue(QueryResponseSerializer(data=response.data).is_valid())
+
+    def test_query_endpoint_no_documents(self):
+        """Test that querying an empty index returns 503."""
+        Document.objects.all().delete()
+        url = reverse("search_api:query")
+        data = {"query_id": "PLAIN-1", "query_text": "heart disease"}
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    def test_query_endpoint_picks_up_documents_indexed_elsewhere(self):
+        """Test that a cached empty index doesn't outlive documents written without signals."""
+        documents = list(Document.objects.all())
+        Document.objects.all().delete()
+        url = reverse("search_api:query")
+        data = {"query_id": "PLAIN-1", "query_text": "heart disease"}
+        self.assertEqual(self.client.post(url, data, format="json").status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        # bulk_create sends no post_save, like `init` running in another process
+        Document.objects.bulk_create(documents)
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["top_docs"]), 3)
+
+    def test_query_view_shares_search_service(self):
+        """Test that views built for separate requests reuse one SearchService."""
+        self.assertIs(QueryView().search_service, QueryView().search_service)
+
+    def test_query_batch_endpoint(self):
+        """Test that a batch returns the same results as one /query/ request per query."""
+        queries = [
+            {"query_id": "PLAIN-1", "query_text": "heart disease"},
+            {"query_id": "PLAIN-2", "query_text": "tumor treatment"},
+        ]
+
+        response = self.client.post(reverse("search_api:query_batch"), {"queries": queries}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(QueryBatchResponseSerializer(data=response.data).is_valid())
+        self.assertEqual([result["query_id"] for result in response.data["results"]], ["PLAIN-1", "PLAIN-2"])
+        for query, result in zip(queries, response.data["results"]):
+            single = self.client.post(reverse("search_api:query"), query, format="json")
+            self.assertEqual(result["top_docs"], single.data["top_docs"])
+            self.assertEqual(result["p5"], single.data["p5"])
+
+    def test_query_batch_endpoint_invalid_input(self):
+        """Test that an empty or oversized batch is rejected."""
+        url = reverse("search_api:query_batch")
+        query = {"query_id": "PLAIN-1", "query_text": "heart disease"}
+
+        for queries in ([], [query] * (settings.QUERY_BATCH_MAX_SIZE + 1)):
+            response = self.client.post(url, {"queries": queries}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_query_endpoint_warm_request_queries(self):
+        """Test that a warm query is served without touching the database."""
+        url = reverse("search_api:query")
+        data = {"query_id": "PLAIN-1", "query_text": "heart disease"}
+        self.client.post(url, data, format="json")
+
+        with self.assertNumQueries(0):
+            response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
 
     def test_query_endpoint_caching(self):
         """Test that repeated queries use caching."""
@@ -410,4 +950,4 @@ class HealthCheckTests(APITestCase):
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data["status"], "healthy")
+        self.assertEqual(response.json(), {"status": "healthy"})
@@ -4,12 +4,13 @@ URL configuration for search_api.
 
 from django.urls import path
 
-from .views import HealthCheckView, QueryView, StatusView
+from .views import HealthCheckView, QueryBatchView, QueryView, StatusView
 
 app_name = "search_api"
 
 urlpatterns = [
     path("api/status/", StatusView.as_view(), name="status"),
     path("api/query/", QueryView.as_view(), name="query"),
+    path("api/query_batch/", QueryBatchView.as_view(), name="query_batch"),
     path("api/health/", HealthCheckView.as_view(), name="health"),
 ]
@@ -1,15 +1,18 @@
 import logging
 
+from django.http import JsonResponse
+from django.views import View
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Document, QueryRelevance
+from .embedding_service import EmbeddingService
+from .models import Document
 from .search_service import SearchService
 from .serializers import (
     ErrorResponseSerializer,
+    QueryBatchRequestSerializer,
     QueryRequestSerializer,
-    QueryResponseSerializer,
     StatusResponseSerializer,
 )
 
@@ -39,7 +42,10 @@ class StatusView(APIView):
         """
         try:
             num_indexed = Document.objects.count()
-            num_queries = QueryRelevance.objects.values("query_id").distinct().count()
+            EmbeddingService.invalidate_doc_matrix_if_stale(num_indexed)
+            # distinct query_ids from the in-memory qrels instead of a COUNT(DISTINCT) per call;
+            # get_qrels reloads them once `init` saved the doc matrix, even from another process
+            num_queries = len(SearchService.get_qrels())
 
             response_data = {
                 "num_of_indexed_items": num_indexed,
@@ -63,7 +69,34 @@ class StatusView(APIView):
             )
 
 
-class QueryView(APIView):
+class SearchServiceView(APIView):
+    """Base for views that search; holds the SearchService shared by all requests."""
+
+    # DRF builds a new view per request; the service is created once and shared
+    _search_service = None
+
+    @property
+    def search_service(self) -> SearchService:
+        if SearchServiceView._search_service is None:
+            SearchServiceView._search_service = SearchService()
+        return SearchServiceView._search_service
+
+    def no_documents_response(self):
+        """503 response if nothing is indexed yet, otherwise None."""
+        # the in-memory doc matrix answers this without a COUNT query per request; an empty
+        # one is re-checked against the table by get_doc_matrix(), so a later `init` is picked up
+        if self.search_service.embedding_service.get_doc_matrix().doc_ids:
+            return None
+        return Response(
+            {
+                "error": "No documents indexed",
+                "details": {"message": "Please run the indexing command first"},
+            },
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+
+class QueryView(SearchServiceView):
     """
     POST /query/
 
@@ -82,10 +115,6 @@ class QueryView(APIView):
     }
     """
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.search_service = SearchService()
-
     def post(self, request):
         """
         Handle POST requests to /query/
@@ -105,28 +134,22 @@ class QueryView(APIView):
 
             logger.info(f"Processing query: {query_id} - {query_text}")
 
-            if Document.objects.count() == 0:
-                return Response(
-                    {
-                        "error": "No documents indexed",
-                        "details": {"message": "Please run the indexing command first"},
-                    },
-                    status=status.HTTP_503_SERVICE_UNAVAILABLE,
-                )
+            no_documents = self.no_documents_response()
+            if no_documents is not None:
+                return no_documents
 
             result = self.search_service.search_and_evaluate(query_text=query_text, query_id=query_id, top_k=10)
 
+            # built from our own values, so it goes out as-is instead of through
+            # QueryResponseSerializer validation; the tests check it against that schema
             response_data = {"top_docs": result["top_docs"], "p5": result["p5"]}
 
-            output_serializer = QueryResponseSerializer(data=response_data)
-            output_serializer.is_valid(raise_exception=True)
-
             logger.info(
                 f"Query {query_id} completed: P@5={result['p5']}, "
                 f"top doc={result['top_docs'][0] if result['top_docs'] else 'none'}"
             )
 
-            return Response(output_serializer.validated_data, status=status.HTTP_200_OK)
+            return Response(response_data, status=status.HTTP_200_OK)
 
         except ValueError as e:
             logger.warning(f"Validation error in QueryView: {e}")
@@ -143,13 +166,92 @@ class QueryView(APIView):
             )
 
 
-class HealthCheckView(APIView):
+class QueryBatchView(SearchServiceView):
+    """
+    POST /query_batch/
+
+    Processes several search queries in one request. The queries are embedded
+    together and scored in one pass, which is much cheaper than one /query/
+    request per query.
+
+    Request:
+    {
+        "queries": [
+            {"query_id": "PLAIN-831", "query_text": "cardiovascular disease"},
+            ...
+        ]
+    }
+
+    Response:
+    {
+        "results": [
+            {"query_id": "PLAIN-831", "top_docs": ["MED-1", ..., "MED-10"], "p5": 0.732},
+            ...
+        ]
+    }
+    """
+
+    def post(self, request):
+        """
+        Handle POST requests to /query_batch/
+
+        Validates input, performs the searches, and calculates P@5 per query.
+        """
+        try:
+            input_serializer = QueryBatchRequestSerializer(data=request.data)
+            if not input_serializer.is_valid():
+                return Response(
+                    {"error": "Invalid input", "details": input_serializer.errors},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            queries = [(query["query_text"], query["query_id"]) for query in input_serializer.validated_data["queries"]]
+
+            logger.info(f"Processing batch of {len(queries)} queries")
+
+            no_documents = self.no_documents_response()
+            if no_documents is not None:
+                return no_documents
+
+            results = self.search_service.search_and_evaluate_batch(queries, top_k=10)
+
+            response_data = {
+                "results": [
+                    {"query_id": query_id, "top_docs": result["top_docs"], "p5": result["p5"]}
+                    for (_, query_id), result in zip(queries, results)
+                ]
+            }
+
+            logger.info(f"Batch of {len(queries)} queries completed")
+
+            # like QueryView, not re-validated through QueryBatchResponseSerializer
+            return Response(response_data, status=status.HTTP_200_OK)
+
+        except ValueError as e:
+            logger.warning(f"Validation error in QueryBatchView: {e}")
+            return Response(
+                {"error": "Invalid query", "details": {"message": str(e)}},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        except Exception as e:
+            logger.error(f"Error in QueryBatchView: {e}", exc_info=True)
+            return Response(
+                {"error": "Internal server error", "details": {"message": str(e)}},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class HealthCheckView(View):
     """
     GET /health/
 
     Simple health check endpoint to verify the service is running.
+
+    A plain Django view: liveness probes poll it often, and DRF's request
+    wrapping, content negotiation and renderers add nothing to a fixed body.
     """
 
     def get(self, request):
         """Return a simple health status."""
-        return Response({"status": "healthy"}, status=status.HTTP_200_OK)
+        return JsonResponse({"status": "healthy"})